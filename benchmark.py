@@ -0,0 +1,236 @@
+import argparse
+from contextlib import contextmanager, redirect_stdout
+import csv
+import importlib
+import io
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from coloring_io import save_coloring
+from colorers import COLORERS
+from k4_count import count_k4_mono
+
+
+# name -> (function whose calls are counted, candidate (edge, color)
+# evaluations per call, largest n run unless limits are ignored). The
+# evaluations are a number or a function of the call's arguments, for
+# calls that score a whole batch of candidates; with no function the
+# evaluations column stays empty.
+BENCHMARKS = {
+    "improve": (None, None, 10),
+    "improve_v2": ("k4_scorer.K4DeltaScorer.trial", 1, 40),
+    # every uncolored edge, both colors, per step
+    "improve_v3": ("improve_v3.edge_impacts", lambda k4_counts, k4_edges, num_edges, ids: 2 * len(ids), 30),
+    "test": ("test.calculate_score_for_edge", 1, 10),
+    "makehui": ("makehui.calculate_probability_edge_color", 1, 20),
+    "numpy_colorer": ("numpy_colorer.edge_color_weights", 2, None),
+    # one step per trial, taking the best of the gain table over every uncolored edge and color
+    "heap_greedy": ("k4_scorer.K4DeltaScorer.trial",
+                    lambda scorer, edge, color: 2 * (scorer.num_edges - len(scorer.colorings)), 200),
+    "parallel_scan": (None, None, 40),
+    "sampled_greedy": ("sampled_greedy.candidate_deltas",
+                       lambda matrix, codes, u, v, k4_samples, rng: 2 * len(u), None),
+    # both colors scored once per edge, then one trial
+    "fixed_order": ("k4_scorer.K4DeltaScorer.trial", 2, None),
+    "bitset": ("bitset_scorer.BitsetK4Scorer.deltas", 2, None),
+}
+
+FIELDS = ["algorithm", "n", "seed", "seconds", "peak_bytes", "evaluations", "mono_k4", "bound", "ratio"]
+
+
+@contextmanager
+def count_calls(target, weight=1):
+    """
+    Count calls to a module-level function or class method given as
+    "module.name" or "module.Class.method" while the block runs.
+    :param weight: amount added per call, or a function of the call's
+                   arguments returning it
+    """
+    counter = [0]
+    if target is None:
+        yield counter
+        return
+    module_name, *path = target.split(".")
+    owner = importlib.import_module(module_name)
+    for name in path[:-1]:
+        owner = getattr(owner, name)
+    original = getattr(owner, path[-1])
+
+    def counted(*args, **kwargs):
+        counter[0] += weight(*args, **kwargs) if callable(weight) else weight
+        return original(*args, **kwargs)
+
+    setattr(owner, path[-1], counted)
+    try:
+        yield counter
+    finally:
+        setattr(owner, path[-1], original)
+
+
+def _seed(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def run_one(name, n, seed, measure_memory=True):
+    """
+    Run one colorer once and return its result row and coloring matrix.
+
+    Wall time and evaluations come from a plain run; peak memory (bytes
+    allocated through tracemalloc, which includes NumPy buffers) from a
+    second identically seeded run, so tracing does not distort the timing.
+    """
+    module, colorer = COLORERS[name]
+    probe, weight, _ = BENCHMARKS[name]
+    importlib.import_module(module)
+    _seed(seed)
+    with redirect_stdout(io.StringIO()), count_calls(probe, weight) as counter:
+        start = time.perf_counter()
+        matrix = colorer(n)
+        seconds = time.perf_counter() - start
+
+    peak_bytes = None
+    if measure_memory:
+        _seed(seed)
+        tracemalloc.start()
+        try:
+            with redirect_stdout(io.StringIO()):
+                colorer(n)
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    mono_k4 = sum(count_k4_mono(matrix))
+    bound = math.comb(n, 4) / 32
+    row = {
+        "algorithm": name,
+        "n": n,
+        "seed": seed,
+        "seconds": seconds,
+        "peak_bytes": peak_bytes,
+        "evaluations": counter[0] if probe else None,
+        "mono_k4": mono_k4,
+        "bound": bound,
+        "ratio": mono_k4 / bound if bound else None,
+    }
+    return row, matrix
+
+
+def run_benchmark(algorithms, sizes, seeds, measure_memory=True, ignore_limits=False, report=print,
+                  colorings_path=None):
+    """
+    Run every algorithm over the grid of sizes and seeds.
+    Sizes above an algorithm's limit are skipped unless ignore_limits is set.
+    With colorings_path, every resulting coloring is appended to that file
+    in the coloring_io format.
+    """
+    rows = []
+    for name in algorithms:
+        max_n = BENCHMARKS[name][2]
+        for n in sizes:
+            if max_n is not None and n > max_n and not ignore_limits:
+                continue
+            for seed in seeds:
+                row, matrix = run_one(name, n, seed, measure_memory)
+                rows.append(row)
+                if colorings_path is not None:
+                    save_coloring(colorings_path, matrix, name, seed, row["mono_k4"], append=True)
+                if report is not None:
+                    report(f"{name:14s} n={n:<4d} seed={seed:<3d} {row['seconds']:10.3f}s "
+                           f"mono={row['mono_k4']} bound={row['bound']:.1f}")
+    return rows
+
+
+def write_results(rows, path):
+    """
+    Write result rows as JSON or, for a .csv path, as CSV.
+    """
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=1)
+
+
+def read_results(path):
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            return [{key: (None if value == "" else value) for key, value in row.items()} for row in csv.DictReader(f)]
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_to_baseline(rows, baseline, slowdown=1.5, min_slowdown=0.05):
+    """
+    Regressions of rows against an earlier result table: runs slower than
+    slowdown times the baseline and by more than min_slowdown seconds (so
+    timer noise on millisecond runs is not flagged), or with more
+    monochromatic K4s.
+    :return: list of messages, empty when nothing regressed
+    """
+    previous = {(row["algorithm"], int(row["n"]), int(row["seed"])): row for row in baseline}
+    regressions = []
+    for row in rows:
+        old = previous.get((row["algorithm"], row["n"], row["seed"]))
+        if old is None:
+            continue
+        key = f"{row['algorithm']} n={row['n']} seed={row['seed']}"
+        old_seconds = float(old["seconds"])
+        if row["seconds"] > slowdown * old_seconds and row["seconds"] - old_seconds > min_slowdown:
+            regressions.append(f"{key}: {row['seconds']:.3f}s vs {old_seconds:.3f}s")
+        if row["mono_k4"] > int(old["mono_k4"]):
+            regressions.append(f"{key}: {row['mono_k4']} monochromatic K4s vs {old['mono_k4']}")
+    return regressions
+
+
+def _int_list(text):
+    return [int(x) for x in text.split(",") if x]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the K4 colorers over a grid of n and seeds.")
+    parser.add_argument("--algorithms", default=",".join(COLORERS),
+                        help="comma separated subset of: " + ", ".join(COLORERS))
+    parser.add_argument("--sizes", type=_int_list, default=[8, 12, 16, 24, 32])
+    parser.add_argument("--seeds", type=_int_list, default=[0])
+    parser.add_argument("--output", default="benchmark.json", help="result table, .json or .csv")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--ignore-limits", action="store_true", help="also run slow colorers at large n")
+    parser.add_argument("--save-colorings", help="append every resulting coloring to this coloring_io file")
+    parser.add_argument("--baseline", help="earlier result table to check for regressions")
+    parser.add_argument("--slowdown", type=float, default=1.5, help="tolerated time factor against the baseline")
+    parser.add_argument("--min-slowdown", type=float, default=0.05, metavar="SECONDS",
+                        help="time differences up to this are never regressions")
+    args = parser.parse_args(argv)
+
+    algorithms = [name for name in args.algorithms.split(",") if name]
+    unknown = [name for name in algorithms if name not in COLORERS]
+    if unknown:
+        parser.error(f"unknown algorithms: {', '.join(unknown)}")
+
+    rows = run_benchmark(algorithms, args.sizes, args.seeds, not args.no_memory, args.ignore_limits,
+                         colorings_path=args.save_colorings)
+    write_results(rows, args.output)
+    print(f"{len(rows)} results written to {os.path.abspath(args.output)}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(rows, read_results(args.baseline), args.slowdown,
+                                          args.min_slowdown)
+        for message in regressions:
+            print("REGRESSION", message)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
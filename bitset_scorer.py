@@ -0,0 +1,179 @@
+import math
+import time
+
+import numpy as np
+
+from order_colorer import ORDERINGS
+
+# Neighborhoods are kept per color as bitsets of uint64 words: bit w of
+# bits[c, v] is set when edge (v, w) has color c, layer UNCOLORED holding
+# the edges without a color. The K4s {u, v, i, j} through an edge that can
+# still become monochromatic in color c are the pairs {i, j} whose edges to
+# u, v and between them are all c or uncolored, so they are counted with
+# ANDs of neighborhoods and popcounts, 64 nodes per word operation.
+UNCOLORED = 2
+
+if hasattr(np, "bitwise_count"):
+    popcount = np.bitwise_count
+else:
+    _BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        """
+        Set bits of every uint64 word (np.bitwise_count for NumPy < 2.0).
+        """
+        words = np.ascontiguousarray(words)
+        return _BYTE_POPCOUNT[words.view(np.uint8)].reshape(words.shape + (8,)).sum(axis=-1)
+
+
+def bitset_nodes(bits):
+    """
+    Indices of the set bits of a word array.
+    """
+    return np.flatnonzero(np.unpackbits(np.ascontiguousarray(bits).view(np.uint8), bitorder="little"))
+
+
+class BitsetK4Scorer:
+    """
+    Running conditional expectation of the number of monochromatic K4s, in
+    units of 2**-6 like K4DeltaScorer, scored from neighborhood bitsets.
+
+    A delta reads O(n) neighborhood rows of n / 64 words each instead of the
+    C(n-2, 2) K4s through the edge, and the state is O(n**2 / 64) words.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.num_words = (n + 63) // 64
+        self.bits = np.zeros((3, n, self.num_words), dtype=np.uint64)
+        self.colorings = {}  # store the color of edges
+        # Bits of the nodes above v, for counting every K4 once
+        nodes = np.arange(self.num_words * 64)
+        above = nodes[None, :] > np.arange(n)[:, None]
+        self._above = np.packbits(above & (nodes < n), axis=1, bitorder="little").view(np.uint64)
+        self.bits[UNCOLORED] = self._above | np.packbits(nodes[None, :] < np.arange(n)[:, None], axis=1,
+                                                         bitorder="little").view(np.uint64)
+        self.total = 2 * math.comb(n, 4)
+
+    @property
+    def score(self):
+        return self.total * 2**-6
+
+    def _set(self, layer, u, v, on):
+        word, bit = divmod(v, 64)
+        mask = np.uint64(1 << bit)
+        if on:
+            self.bits[layer, u, word] |= mask
+        else:
+            self.bits[layer, u, word] &= ~mask
+
+    def k4_histogram(self, edge, color):
+        """
+        K4s through an edge with no edge of the other color, by how many of
+        their other five edges already have this color.
+        :return: length-6 int64 array
+        """
+        u, v = edge
+        same = self.bits[color]
+        free = self.bits[UNCOLORED]
+        # Nodes whose edges to u and v are both usable, by how many of the two have the color
+        classes = np.stack([free[u] & free[v], (same[u] & free[v]) | (free[u] & same[v]), same[u] & same[v]])
+        histogram = np.zeros(6, dtype=np.int64)
+        rows = [bitset_nodes(mask) for mask in classes]
+        for x in range(3):
+            if not len(rows[x]):
+                continue
+            # Ordered pairs (i in class x, j in class y) whose edge ij has the color / no color
+            same_pairs = popcount(same[rows[x]][:, None, :] & classes[None, :, :]).sum(axis=(0, 2))
+            free_pairs = popcount(free[rows[x]][:, None, :] & classes[None, :, :]).sum(axis=(0, 2))
+            for y in range(x, 3):
+                halve = 2 if x == y else 1
+                histogram[x + y + 1] += int(same_pairs[y]) // halve
+                histogram[x + y] += int(free_pairs[y]) // halve
+        return histogram
+
+    def deltas(self, edge):
+        """
+        Exact change of the total (units of 2**-6) if the edge got color 0 / color 1.
+
+        A K4 that can still become monochromatic in color c with m >= 1
+        edges of c weighs 2**m: coloring the edge c doubles it, the other
+        color zeroes it. All-uncolored K4s keep their weight either way.
+        """
+        if edge in self.colorings:
+            raise ValueError(f"edge {edge} is already colored")
+        weights = 2 ** np.arange(6)
+        weights[0] = 0
+        pressure = [int(self.k4_histogram(edge, color) @ weights) for color in (0, 1)]
+        return pressure[0] - pressure[1], pressure[1] - pressure[0]
+
+    def delta(self, edge, color):
+        return self.deltas(edge)[color]
+
+    def color_edge(self, edge, color):
+        """
+        Permanently color an edge and return the resulting score.
+        """
+        return self._color(edge, color, self.delta(edge, color))
+
+    def _color(self, edge, color, delta):
+        self.total += delta
+        u, v = edge
+        for a, b in ((u, v), (v, u)):
+            self._set(UNCOLORED, a, b, False)
+            self._set(color, a, b, True)
+        self.colorings[edge] = color
+        return self.score
+
+    def mono_k4_count(self):
+        """
+        Number of monochromatic K4s, each counted at its two smallest nodes
+        u < v as the edges of its color inside their common neighborhood above v.
+        """
+        mono = 0
+        for color in (0, 1):
+            same = self.bits[color]
+            for u in range(self.n):
+                for v in bitset_nodes(same[u] & self._above[u]):
+                    common = same[u] & same[v] & self._above[v]
+                    inside = bitset_nodes(common)
+                    if len(inside) >= 2:
+                        mono += int(popcount(same[inside] & common).sum()) // 2
+        return mono
+
+
+def count_k4_mono_bitset(coloring):
+    """
+    Number of monochromatic K4s of an n x n coloring matrix, counted with bitsets.
+    """
+    scorer = BitsetK4Scorer(len(coloring))
+    for color in (0, 1):
+        rows = (np.asarray(coloring) == color)
+        np.fill_diagonal(rows, False)
+        padded = np.zeros((len(rows), scorer.num_words * 64), dtype=bool)
+        padded[:, :len(rows)] = rows
+        scorer.bits[color] = np.packbits(padded, axis=1, bitorder="little").view(np.uint64)
+    return scorer.mono_k4_count()
+
+
+def bitset_coloring(n, ordering="lexicographic", seed=None):
+    """
+    One-pass fixed-order coloring (see order_colorer) scored with bitsets,
+    each edge getting the color of smaller delta, color 0 on ties.
+    :return: (colorings, number of monochromatic K4s)
+    """
+    scorer = BitsetK4Scorer(n)
+    for edge in ORDERINGS[ordering](n, np.random.default_rng(seed)):
+        deltas = scorer.deltas(edge)
+        color = 0 if deltas[0] <= deltas[1] else 1
+        scorer._color(edge, color, deltas[color])
+    return scorer.colorings, scorer.mono_k4_count()
+
+
+if __name__ == "__main__":
+    n = 60
+    start_time = time.time()
+    colorings, same_colored_K4 = bitset_coloring(n)
+    print(time.time() - start_time)
+    print(same_colored_K4)
+    print(math.comb(n, 4) // 32)
@@ -0,0 +1,94 @@
+from collections import namedtuple
+import json
+import os
+import struct
+
+import numpy as np
+
+# Layout: fixed header, JSON metadata, zero padding up to a 64-byte
+# boundary, then two packed bit arrays over the edge ids of K_n (colex
+# order, see k4_index): bit e of `colored` says whether edge e has a
+# color, bit e of `ones` whether that color is 1. Both arrays can be
+# memory-mapped in place.
+MAGIC = b"K4CK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIq")  # magic, version, reserved, n, metadata length
+ALIGN = 64
+
+Checkpoint = namedtuple("Checkpoint", "n algorithm total state colored ones")
+
+
+def pack_edge_colors(edge_colors):
+    """
+    Pack per-edge colors (-1 uncolored, 0, 1) into (colored, ones) bit arrays.
+    """
+    edge_colors = np.asarray(edge_colors)
+    return np.packbits(edge_colors >= 0), np.packbits(edge_colors == 1)
+
+
+def unpack_edge_colors(colored, ones, num_edges):
+    """
+    Inverse of pack_edge_colors: int8 per-edge colors, -1 for uncolored.
+    """
+    is_colored = np.unpackbits(colored, count=num_edges).astype(bool)
+    edge_colors = np.unpackbits(ones, count=num_edges).astype(np.int8)
+    edge_colors[~is_colored] = -1
+    return edge_colors
+
+
+def _data_offset(metadata_length):
+    end = HEADER.size + metadata_length
+    return (end + ALIGN - 1) // ALIGN * ALIGN
+
+
+def save_checkpoint(path, n, edge_colors, algorithm, total=None, state=None):
+    """
+    Write a partial coloring and its scoring state.
+
+    The file is written next to `path` and renamed over it, so an
+    interruption never leaves a truncated checkpoint behind.
+    :param path: checkpoint file
+    :param n: number of nodes
+    :param edge_colors: per-edge colors in edge id order, -1 for uncolored
+    :param algorithm: name of the colorer, checked on resume
+    :param total: running score of the scorer (units of 2**-6), if any
+    :param state: JSON-serializable loop state of the colorer
+    """
+    metadata = json.dumps({"algorithm": algorithm, "total": total, "state": state or {}}).encode()
+    colored, ones = pack_edge_colors(edge_colors)
+    offset = _data_offset(len(metadata))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, n, len(metadata)))
+        f.write(metadata)
+        f.write(b"\0" * (offset - HEADER.size - len(metadata)))
+        f.write(colored.tobytes())
+        f.write(ones.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path, mmap=True):
+    """
+    Read a checkpoint written by save_checkpoint.
+    :param mmap: map the bit arrays from the file instead of reading them
+    :return: Checkpoint(n, algorithm, total, state, colored, ones); use
+             unpack_edge_colors(colored, ones, C(n, 2)) for the colors
+    """
+    with open(path, "rb") as f:
+        magic, version, _, n, metadata_length = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a coloring checkpoint")
+        if version != VERSION:
+            raise ValueError(f"unsupported checkpoint version {version}")
+        metadata = json.loads(f.read(metadata_length))
+
+    num_bytes = (n * (n - 1) // 2 + 7) // 8
+    offset = _data_offset(metadata_length)
+    if mmap:
+        bits = np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(2 * num_bytes,))
+    else:
+        bits = np.fromfile(path, dtype=np.uint8, count=2 * num_bytes, offset=offset)
+    return Checkpoint(n, metadata["algorithm"], metadata["total"], metadata["state"],
+                      bits[:num_bytes], bits[num_bytes:])
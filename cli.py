@@ -0,0 +1,52 @@
+import argparse
+import math
+import random
+import sys
+import time
+
+import numpy as np
+
+from colorers import COLORERS, run_colorer
+from k4_count import count_k4_mono
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Color K_n with one of the colorers, without importing matplotlib unless --render is given.")
+    parser.add_argument("algorithm", choices=sorted(COLORERS))
+    parser.add_argument("n", type=int, help="number of nodes")
+    parser.add_argument("--seed", type=int, help="seed for colorers with random choices")
+    parser.add_argument("--local-search", type=float, metavar="SECONDS",
+                        help="refine the coloring with tabu local search for this long")
+    parser.add_argument("--output", help="write the coloring to this coloring_io file")
+    parser.add_argument("--render", metavar="IMAGE",
+                        help="draw the coloring to this image (spring layout for small n, heatmap otherwise)")
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+
+    start_time = time.time()
+    matrix = run_colorer(args.algorithm, args.n)
+    if args.local_search:
+        from local_search import local_search
+        matrix, _, _ = local_search(matrix, time_budget=args.local_search, tabu_tenure=max(args.n // 3, 1),
+                                    seed=args.seed)
+    elapsed_time = time.time() - start_time
+    num_k4 = sum(count_k4_mono(matrix))
+
+    print(f"{args.algorithm}: {args.n} nodes, {num_k4} monochromatic K4s, "
+          f"bound {math.comb(args.n, 4) / 32}, {elapsed_time:.3f} seconds")
+
+    if args.output:
+        from coloring_io import save_coloring
+        save_coloring(args.output, matrix, args.algorithm, args.seed, num_k4)
+    if args.render:
+        from render import render_coloring
+        render_coloring(matrix, args.render, title=f"{args.algorithm} coloring of $K_{{{args.n}}}$")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+from itertools import combinations
+import math
+import time
+
+import numpy as np
+
+from k4_index import colex_combinations, edge_id
+from k4_scorer import other_nodes
+
+# Generalization of k4_scorer to K_s cliques and k colors. In a uniformly
+# random k-coloring a given K_s is monochromatic with probability
+# k * k**-C(s, 2); once m of its edges carry a single color the probability
+# is k**(m - C(s, 2)), and 0 as soon as two colors meet. Scores are kept as
+# integers in units of k**-C(s, 2): an uncolored clique weighs k, a clique
+# with m edges of one color k**m. For s = 4, k = 2 this is exactly the
+# K4DeltaScorer total.
+
+
+def clique_weights(counts, k):
+    """
+    Expected monochromatic contribution of each clique, in units of k**-C(s, 2).
+    :param counts: (num_cliques, k) colored-edge counts per color
+    :return: int64 array
+    """
+    counts = np.asarray(counts)
+    colored = counts.sum(axis=1).astype(np.int64)
+    weights = np.int64(k) ** colored
+    weights[colored == 0] = k
+    weights[(counts > 0).sum(axis=1) > 1] = 0
+    return weights
+
+
+class CliqueDeltaScorer:
+    """
+    Running conditional expectation of the number of monochromatic K_s in a
+    k-coloring of K_n.
+
+    Coloring edge (u, v) only changes the C(n-2, s-2) cliques through it,
+    which are read off the n x n color matrix on demand (the lazy mode of
+    K4DeltaScorer), so delta(), trial(), commit() and rollback() cost
+    O(C(n-2, s-2) * C(s, 2)) and memory stays O(n**2) plus one batch.
+    """
+
+    def __init__(self, n, s=4, k=2, instrumentation=None):
+        if s < 3 or k < 2:
+            raise ValueError("need cliques of at least 3 nodes and at least 2 colors")
+        self.n = n
+        self.s = s
+        self.k = k
+        self.clique_edges = math.comb(s, 2)
+        self.unit = float(k) ** -self.clique_edges
+        self.instrumentation = instrumentation  # optional Instrumentation, None costs nothing
+        self.colorings = {}  # store the color of edges
+        self.edges = colex_combinations(n, 2)
+        self.edge_list = [tuple(edge) for edge in self.edges.tolist()]
+        self.num_edges = len(self.edge_list)
+        self.edge_colors = np.full(self.num_edges, -1, dtype=np.int8)
+        self.matrix = np.full((n, n), -1, dtype=np.int8)
+        # The cliques through an edge: (s-2)-subsets of the n - 2 other nodes
+        self._subsets = colex_combinations(max(n - 2, 0), s - 2)
+        self._inner = np.array(list(combinations(range(s - 2), 2)), dtype=np.intp).reshape(-1, 2)
+        self.total = k * math.comb(n, s)
+        self._trial = None
+
+    @property
+    def score(self):
+        return self.total * self.unit
+
+    def cliques_through(self, edge):
+        """
+        The s - 2 nodes completing each clique through an edge, one clique per row.
+        """
+        return other_nodes(self.n, edge)[self._subsets]
+
+    def clique_counts_through(self, edge):
+        """
+        Colored-edge counts per color of the cliques through an edge, excluding
+        the edge itself.
+        :return: (C(n-2, s-2), k) int64 array, in cliques_through order
+        """
+        u, v = edge
+        nodes = self.cliques_through(edge)
+        colors = np.concatenate([self.matrix[u][nodes], self.matrix[v][nodes],
+                                 self.matrix[nodes[:, self._inner[:, 0]], nodes[:, self._inner[:, 1]]]], axis=1)
+        return np.stack([(colors == color).sum(axis=1) for color in range(self.k)], axis=1)
+
+    def _gains(self, counts, color):
+        after = counts.copy()
+        after[:, color] += 1
+        return clique_weights(after, self.k) - clique_weights(counts, self.k)
+
+    def delta(self, edge, color):
+        """
+        Exact change of the total (in units of k**-C(s, 2)) if the edge were colored.
+        """
+        if edge in self.colorings:
+            raise ValueError(f"edge {edge} is already colored")
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            start = time.perf_counter()
+        delta = int(self._gains(self.clique_counts_through(edge), color).sum())
+        if instrumentation is not None:
+            instrumentation.count("deltas")
+            instrumentation.add_time("scoring", time.perf_counter() - start)
+        return delta
+
+    def deltas(self, edge):
+        """
+        delta(edge, color) for every color, sharing one read of the cliques.
+        """
+        if edge in self.colorings:
+            raise ValueError(f"edge {edge} is already colored")
+        counts = self.clique_counts_through(edge)
+        return [int(self._gains(counts, color).sum()) for color in range(self.k)]
+
+    def _set_color(self, edge, color):
+        u, v = edge
+        self.edge_colors[edge_id(u, v)] = color
+        self.matrix[u, v] = self.matrix[v, u] = color
+
+    def trial(self, edge, color):
+        """
+        Tentatively color an edge and return the resulting score.
+        The trial must be followed by commit() or rollback().
+        """
+        if self._trial is not None:
+            raise RuntimeError("a trial is already pending, commit or roll it back first")
+        delta = self.delta(edge, color)
+        self.total += delta
+        self.colorings[edge] = color
+        self._set_color(edge, color)
+        self._trial = (edge, color, delta)
+        if self.instrumentation is not None:
+            self.instrumentation.count("trials")
+        return self.score
+
+    def commit(self):
+        """
+        Keep the pending trial and return its (edge, color).
+        """
+        if self._trial is None:
+            raise RuntimeError("no pending trial to commit")
+        edge, color, _ = self._trial
+        self._trial = None
+        if self.instrumentation is not None:
+            self.instrumentation.count("commits")
+        return edge, color
+
+    def rollback(self):
+        """
+        Undo the pending trial.
+        """
+        if self._trial is None:
+            raise RuntimeError("no pending trial to roll back")
+        edge, _, delta = self._trial
+        self._trial = None
+        self.total -= delta
+        if self.instrumentation is not None:
+            self.instrumentation.count("rollbacks")
+        del self.colorings[edge]
+        self._set_color(edge, -1)
+
+    def color_edge(self, edge, color):
+        """
+        Permanently color an edge and return the resulting score.
+        """
+        score = self.trial(edge, color)
+        self.commit()
+        return score
+
+    def mono_clique_count(self):
+        """
+        Number of K_s whose edges are all colored with the same color.
+        """
+        # Walk the cliques by their largest node d, O(n**(s-1)) memory at a time
+        pairs = np.array(list(combinations(range(self.s), 2)), dtype=np.intp)
+        mono = 0
+        for d in range(self.s - 1, self.n):
+            rest = colex_combinations(d, self.s - 1)
+            nodes = np.column_stack([rest, np.full(len(rest), d, dtype=rest.dtype)])
+            colors = self.matrix[nodes[:, pairs[:, 0]], nodes[:, pairs[:, 1]]]
+            mono += int(np.count_nonzero((colors[:, 0] >= 0) & (colors == colors[:, :1]).all(axis=1)))
+        return mono
+
+
+def clique_greedy_coloring(n, s=4, k=2, instrumentation=None):
+    """
+    Method of conditional expectations for K_s with k colors: each edge, in
+    edge id order, gets the color that raises the expected number of
+    monochromatic K_s the least (lowest color on ties), so the result has
+    at most k * C(n, s) / k**C(s, 2) monochromatic K_s.
+    :return: (colorings, number of monochromatic K_s)
+    """
+    scorer = CliqueDeltaScorer(n, s, k, instrumentation)
+    for edge in scorer.edge_list:
+        deltas = scorer.deltas(edge)
+        scorer.color_edge(edge, deltas.index(min(deltas)))
+        if instrumentation is not None:
+            instrumentation.progress(len(scorer.colorings), scorer.num_edges, score=scorer.score)
+    return scorer.colorings, scorer.mono_clique_count()
+
+
+if __name__ == "__main__":
+    for n, s, k in [(20, 4, 2), (20, 5, 2), (14, 4, 3)]:
+        start_time = time.time()
+        colorings, mono = clique_greedy_coloring(n, s, k)
+        bound = k * math.comb(n, s) / k**math.comb(s, 2)
+        print(f"n={n} K{s} {k} colors: {mono} monochromatic, bound {bound:.1f}, "
+              f"{time.time() - start_time:.3f} seconds")
@@ -0,0 +1,104 @@
+import numpy as np
+
+from k4_count import colorings_to_matrix
+
+
+def _run_improve(n):
+    from improve import optimized_greedy_coloring
+    _, colorings, _ = optimized_greedy_coloring(n)
+    return colorings_to_matrix(n, colorings)
+
+
+def _run_improve_v2(n, index=None, instrumentation=None):
+    from improve_v2 import optimized_greedy_coloring_v2
+    _, colorings, _, _ = optimized_greedy_coloring_v2(n, instrumentation, index=index)
+    return colorings_to_matrix(n, colorings)
+
+
+def _run_improve_v3(n):
+    from improve_v3 import greedy_coloring_v3
+    _, colorings, _ = greedy_coloring_v3(n)
+    return colorings_to_matrix(n, colorings)
+
+
+def _run_test(n):
+    from test import greedy_coloring_updated
+    _, colorings, _ = greedy_coloring_updated(n)
+    return colorings_to_matrix(n, colorings)
+
+
+def _run_makehui(n):
+    from makehui import derandomized_coloring
+    return derandomized_coloring(n).matrix
+
+
+def _run_numpy_colorer(n):
+    from numpy_colorer import derandomized_coloring_numpy
+    return derandomized_coloring_numpy(n)
+
+
+def _run_heap_greedy(n, index=None, instrumentation=None):
+    from heap_greedy import heap_greedy_coloring
+    colorings, _ = heap_greedy_coloring(n, instrumentation=instrumentation, index=index)
+    return colorings_to_matrix(n, colorings)
+
+
+def _run_parallel_scan(n):
+    from parallel_scan import parallel_greedy_coloring
+    colorings, _ = parallel_greedy_coloring(n)
+    return colorings_to_matrix(n, colorings)
+
+
+def _run_fixed_order(n, index=None, instrumentation=None):
+    from order_colorer import fixed_order_coloring
+    colorings, _ = fixed_order_coloring(n, instrumentation=instrumentation, index=index)
+    return colorings_to_matrix(n, colorings)
+
+
+def _run_bitset(n):
+    from bitset_scorer import bitset_coloring
+    colorings, _ = bitset_coloring(n)
+    return colorings_to_matrix(n, colorings)
+
+
+def _run_sampled_greedy(n):
+    from sampled_greedy import sampled_greedy_coloring
+    # seeded from the global NumPy state, so benchmark seeds apply
+    matrix, _ = sampled_greedy_coloring(n, seed=np.random.randint(2**31), count=False)
+    return matrix
+
+
+# name -> (module to import up front, function(n) returning an n x n coloring matrix)
+COLORERS = {
+    "improve": ("improve", _run_improve),
+    "improve_v2": ("improve_v2", _run_improve_v2),
+    "improve_v3": ("improve_v3", _run_improve_v3),
+    "test": ("test", _run_test),
+    "makehui": ("makehui", _run_makehui),
+    "numpy_colorer": ("numpy_colorer", _run_numpy_colorer),
+    "heap_greedy": ("heap_greedy", _run_heap_greedy),
+    "parallel_scan": ("parallel_scan", _run_parallel_scan),
+    "sampled_greedy": ("sampled_greedy", _run_sampled_greedy),
+    "fixed_order": ("order_colorer", _run_fixed_order),
+    "bitset": ("bitset_scorer", _run_bitset),
+}
+
+# Colorers built on K4DeltaScorer, whose function also takes index=K4Index
+# to reuse a precomputed index (see K4Index.prefix) and instrumentation=
+# Instrumentation for counters and progress
+INDEXED_COLORERS = {"improve_v2", "heap_greedy", "fixed_order"}
+INSTRUMENTED_COLORERS = {"improve_v2", "heap_greedy", "fixed_order"}
+
+
+def run_colorer(name, n, index=None, instrumentation=None):
+    """
+    Color K_n with the named colorer and return the n x n int8 coloring matrix.
+    :param index: optional K4Index of some K_m, m >= n, used by INDEXED_COLORERS
+    :param instrumentation: optional Instrumentation, used by INSTRUMENTED_COLORERS
+    """
+    kwargs = {}
+    if index is not None and name in INDEXED_COLORERS:
+        kwargs["index"] = index
+    if instrumentation is not None and name in INSTRUMENTED_COLORERS:
+        kwargs["instrumentation"] = instrumentation
+    return COLORERS[name][1](n, **kwargs)
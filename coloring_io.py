@@ -0,0 +1,118 @@
+from collections import namedtuple
+import os
+import struct
+
+import numpy as np
+
+from k4_count import count_k4_mono
+from k4_index import colex_combinations
+
+# A coloring file holds one or more records, each a 64-byte header
+#   magic, version, reserved, n, seed (-1 if none), mono-K4 count (-1 if
+#   unknown), algorithm name (UTF-8, zero padded)
+# followed by one bit per edge of K_n in edge id order (the upper triangle
+# walked column by column, see k4_index), zero padded to a multiple of 8
+# bytes. The bits of any record can be memory-mapped without a copy.
+MAGIC = b"K4CL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIqq36s")
+RECORD_ALIGN = 8
+
+StoredColoring = namedtuple("StoredColoring", "n algorithm seed mono_k4 bits")
+
+
+def matrix_to_edge_colors(matrix):
+    """
+    Per-edge colors of an n x n coloring matrix, in edge id order.
+    """
+    edges = colex_combinations(len(matrix), 2)
+    return np.asarray(matrix)[edges[:, 0], edges[:, 1]]
+
+
+def edge_colors_to_matrix(n, edge_colors):
+    """
+    n x n int8 coloring matrix (-1 on the diagonal) from per-edge colors.
+    """
+    matrix = np.full((n, n), -1, dtype=np.int8)
+    edges = colex_combinations(n, 2)
+    matrix[edges[:, 0], edges[:, 1]] = matrix[edges[:, 1], edges[:, 0]] = edge_colors
+    return matrix
+
+
+def _bits_size(n):
+    num_bytes = (n * (n - 1) // 2 + 7) // 8
+    return (num_bytes + RECORD_ALIGN - 1) // RECORD_ALIGN * RECORD_ALIGN
+
+
+def save_coloring(path, matrix, algorithm, seed=None, mono_k4=None, append=False):
+    """
+    Write a full 2-coloring of K_n as one record.
+    :param matrix: n x n coloring matrix without uncolored edges
+    :param algorithm: name of the colorer (at most 36 UTF-8 bytes)
+    :param seed: random seed of the run, if any
+    :param mono_k4: monochromatic K4 count, counted here when None
+    :param append: add the record to an existing file instead of replacing it
+    """
+    n = len(matrix)
+    edge_colors = matrix_to_edge_colors(matrix)
+    if (edge_colors < 0).any():
+        raise ValueError("only full colorings can be stored")
+    name = algorithm.encode()
+    if len(name) > 36:
+        raise ValueError(f"algorithm name {algorithm!r} is longer than 36 bytes")
+    if mono_k4 is None:
+        mono_k4 = sum(count_k4_mono(matrix))
+
+    bits = np.zeros(_bits_size(n), dtype=np.uint8)
+    packed = np.packbits(edge_colors == 1)
+    bits[:len(packed)] = packed
+    with open(path, "ab" if append else "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, n, -1 if seed is None else seed, mono_k4, name))
+        f.write(bits.tobytes())
+
+
+def load_colorings(path):
+    """
+    All records of a coloring file, with their bits memory-mapped from the file.
+    :return: list of StoredColoring(n, algorithm, seed, mono_k4, bits)
+    """
+    records = []
+    if os.path.getsize(path) == 0:
+        return records
+    # One mapping of the whole file, every record's bits a view into it
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    offset = 0
+    while offset < len(data):
+        magic, version, _, n, seed, mono_k4, name = HEADER.unpack(data[offset:offset + HEADER.size].tobytes())
+        if magic != MAGIC:
+            raise ValueError(f"{path}: no coloring record at byte {offset}")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported coloring version {version}")
+        start = offset + HEADER.size
+        bits = data[start:start + _bits_size(n)]
+        records.append(StoredColoring(n, name.rstrip(b"\0").decode(),
+                                      None if seed < 0 else seed, None if mono_k4 < 0 else mono_k4, bits))
+        offset = start + _bits_size(n)
+    return records
+
+
+def load_coloring(path):
+    """
+    The first record of a coloring file, its bits memory-mapped from the file.
+    """
+    return load_colorings(path)[0]
+
+
+def stored_edge_colors(stored):
+    """
+    int8 per-edge colors of a stored coloring, in edge id order.
+    """
+    n = stored.n
+    return np.unpackbits(stored.bits, count=n * (n - 1) // 2).astype(np.int8)
+
+
+def stored_matrix(stored):
+    """
+    n x n int8 coloring matrix of a stored coloring, ready for k4_count or local_search.
+    """
+    return edge_colors_to_matrix(stored.n, stored_edge_colors(stored))
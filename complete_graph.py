@@ -0,0 +1,109 @@
+from itertools import combinations
+
+import numpy as np
+
+
+def complete_edges(n):
+    """
+    Edges (u, v) with u < v of K_n, in the same lexicographic order as
+    networkx.complete_graph(n).edges().
+    """
+    return combinations(range(n), 2)
+
+
+class CompleteGraph:
+    """
+    Minimal stand-in for networkx.complete_graph(n): the colorers only need
+    its nodes and edges, which are generated on demand instead of being
+    stored as an adjacency dict of dicts.
+    """
+
+    def __init__(self, n):
+        self.n = n
+
+    def __len__(self):
+        return self.n
+
+    def nodes(self):
+        return range(self.n)
+
+    def edges(self):
+        return complete_edges(self.n)
+
+    def neighbors(self, node):
+        return (other for other in range(self.n) if other != node)
+
+    def number_of_nodes(self):
+        return self.n
+
+    def number_of_edges(self):
+        return self.n * (self.n - 1) // 2
+
+    def to_networkx(self):
+        """
+        Export as a networkx graph (imports networkx on first use).
+        """
+        import networkx as nx
+        return nx.complete_graph(self.n)
+
+
+class ColoringStore:
+    """
+    Edge 2-coloring of K_n kept in an n x n int8 matrix (-1 for uncolored),
+    with a dict-like interface over (u, v) edge tuples.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.matrix = np.full((n, n), -1, dtype=np.int8)
+        self._num_colored = 0
+
+    def __len__(self):
+        return self._num_colored
+
+    def __contains__(self, edge):
+        u, v = edge
+        return self.matrix[u, v] >= 0
+
+    def __getitem__(self, edge):
+        u, v = edge
+        color = self.matrix[u, v]
+        if color < 0:
+            raise KeyError(edge)
+        return int(color)
+
+    def get(self, edge, default=None):
+        u, v = edge
+        color = self.matrix[u, v]
+        return default if color < 0 else int(color)
+
+    def __setitem__(self, edge, color):
+        u, v = edge
+        if self.matrix[u, v] < 0:
+            self._num_colored += 1
+        self.matrix[u, v] = self.matrix[v, u] = color
+
+    def __delitem__(self, edge):
+        u, v = edge
+        if self.matrix[u, v] < 0:
+            raise KeyError(edge)
+        self.matrix[u, v] = self.matrix[v, u] = -1
+        self._num_colored -= 1
+
+    def items(self):
+        """
+        (edge, color) pairs of the colored edges, in edge order.
+        """
+        u, v = np.nonzero(np.triu(self.matrix >= 0, 1))
+        return [((int(a), int(b)), int(self.matrix[a, b])) for a, b in zip(u, v)]
+
+    def to_networkx(self):
+        """
+        Export as networkx.complete_graph(n) with a 'color' attribute on every
+        colored edge, the representation makehui.py used to work on.
+        """
+        import networkx as nx
+        graph = nx.complete_graph(self.n)
+        for (u, v), color in self.items():
+            graph.add_edge(u, v, color=color)
+        return graph
@@ -0,0 +1,120 @@
+import argparse
+import math
+import multiprocessing as mp
+import os
+import sys
+import time
+
+from heap_greedy import heap_greedy_coloring
+from k4_count import colorings_to_matrix
+from order_colorer import fixed_order_coloring
+
+
+def _ties(n, seed):
+    return heap_greedy_coloring(n, seed=seed)
+
+
+def _order(n, seed):
+    return fixed_order_coloring(n, "random", seed, random_ties=True)
+
+
+def _initial(n, seed):
+    # a few random edges, about one per node, then best-edge greedy
+    return heap_greedy_coloring(n, seed=seed, initial=max(n // 2, 1))
+
+
+# name -> function(n, seed) returning (colorings, number of monochromatic K4s)
+VARIANTS = {
+    "ties": _ties,  # best-edge greedy, random tie-breaking
+    "initial": _initial,  # best-edge greedy after random initial edges
+    "order": _order,  # one pass in a random edge order
+}
+
+
+def _run(task):
+    variant, n, seed = task
+    start = time.perf_counter()
+    colorings, mono = VARIANTS[variant](n, seed)
+    return variant, seed, mono, time.perf_counter() - start, colorings_to_matrix(n, colorings)
+
+
+def ensemble_coloring(n, runs=32, workers=None, variants=tuple(VARIANTS), seed=0, target=None,
+                      time_budget=None, report=None):
+    """
+    Run randomized greedy variants concurrently and keep the best coloring.
+
+    Run i uses variant variants[i % len(variants)] with seed seed + i, so an
+    ensemble is reproducible. As soon as a run reaches target monochromatic
+    K4s, or the time budget is spent, the pool is terminated and the
+    remaining runs are dropped.
+    :param n: number of nodes of the complete graph
+    :param runs: number of randomized runs
+    :param workers: pool size, os.cpu_count() by default; 1 runs in-process
+    :param variants: names from VARIANTS to cycle through
+    :param seed: seed of the first run
+    :param target: stop once a coloring has at most this many monochromatic K4s
+    :param time_budget: stop after this many seconds (checked as runs finish)
+    :param report: optional function(variant, seed, mono, seconds) called per finished run
+    :return: (best n x n coloring matrix, its monochromatic K4 count, list of
+             (variant, seed, mono, seconds) of every finished run)
+    """
+    workers = workers or os.cpu_count()
+    tasks = [(variants[i % len(variants)], n, seed + i) for i in range(runs)]
+    start_time = time.time()
+    best_matrix, best_mono = None, None
+    results = []
+
+    pool = mp.Pool(workers) if workers > 1 else None
+    try:
+        finished = pool.imap_unordered(_run, tasks) if pool is not None else map(_run, tasks)
+        for variant, run_seed, mono, seconds, matrix in finished:
+            results.append((variant, run_seed, mono, seconds))
+            if report is not None:
+                report(variant, run_seed, mono, seconds)
+            if best_mono is None or mono < best_mono:
+                best_matrix, best_mono = matrix, mono
+            if target is not None and best_mono <= target:
+                break
+            if time_budget is not None and time.time() - start_time >= time_budget:
+                break
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return best_matrix, best_mono, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Best of many randomized greedy colorings of K_n, run in parallel.")
+    parser.add_argument("n", type=int, help="number of nodes")
+    parser.add_argument("--runs", type=int, default=32)
+    parser.add_argument("--workers", type=int, help="number of processes (default: all CPUs, 1 runs serially)")
+    parser.add_argument("--variants", default=",".join(VARIANTS), help="comma separated subset of: " + ", ".join(VARIANTS))
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first run")
+    parser.add_argument("--target", type=int, help="stop at this many monochromatic K4s")
+    parser.add_argument("--time-budget", type=float, metavar="SECONDS")
+    parser.add_argument("--output", help="write the best coloring to this coloring_io file")
+    args = parser.parse_args(argv)
+
+    variants = tuple(name for name in args.variants.split(",") if name)
+    unknown = [name for name in variants if name not in VARIANTS]
+    if unknown:
+        parser.error(f"unknown variants: {', '.join(unknown)}")
+
+    def report(variant, seed, mono, seconds):
+        print(f"{variant:8s} seed={seed:<5d} mono={mono} {seconds:.3f}s")
+
+    start_time = time.time()
+    matrix, mono, results = ensemble_coloring(args.n, args.runs, args.workers, variants, args.seed, args.target,
+                                              args.time_budget, report)
+    print(f"best of {len(results)} runs: {mono} monochromatic K4s, bound {math.comb(args.n, 4) / 32}, "
+          f"{time.time() - start_time:.3f} seconds")
+    if args.output:
+        from coloring_io import save_coloring
+        best = min(results, key=lambda result: result[2])
+        save_coloring(args.output, matrix, f"ensemble/{best[0]}", best[1], mono)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
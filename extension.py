@@ -0,0 +1,131 @@
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+from coloring_io import load_coloring, matrix_to_edge_colors, save_coloring, stored_matrix
+from k4_scorer import K4DeltaScorer, K4_GAINS
+
+
+def scorer_from_matrix(matrix, lazy=True):
+    """
+    K4DeltaScorer holding an existing coloring of K_n, e.g. one loaded with coloring_io.
+    """
+    scorer = K4DeltaScorer(len(matrix), lazy)
+    scorer.load(matrix_to_edge_colors(matrix))
+    return scorer
+
+
+def _best_color(scorer, edge):
+    # Both deltas from one read of the K4s through the edge, color 0 on ties
+    counts = scorer.k4_counts_through(edge)
+    delta_0, delta_1 = K4_GAINS[counts[:, 0], counts[:, 1]].sum(axis=0)
+    return (0 if delta_0 <= delta_1 else 1), min(delta_0, delta_1)
+
+
+def repair_node(scorer, node, passes=1):
+    """
+    Flip edges at one node while that lowers the monochromatic K4 count.
+
+    A pass visits the node's colored edges in order. It flips an edge when
+    more K4s through it are monochromatic than would be after the flip.
+    :return: number of flips
+    """
+    flips = 0
+    edges = [(min(i, node), max(i, node)) for i in range(scorer.n) if i != node]
+    for _ in range(passes):
+        flipped = False
+        for edge in edges:
+            color = scorer.colorings.get(edge)
+            if color is None:
+                continue
+            counts = scorer.k4_counts_through(edge)
+            gain = np.count_nonzero(counts[:, 1 - color] == 5) - np.count_nonzero(counts[:, color] == 6)
+            if gain < 0:
+                scorer.recolor(edge, 1 - color)
+                flips += 1
+                flipped = True
+        if not flipped:
+            break
+    return flips
+
+
+def extend_coloring(scorer, n, best_edge=False, repair_passes=0, index=None):
+    """
+    Grow the coloring held by a scorer to K_n, one node at a time.
+
+    Only the edges of each new node are colored, with the scorer's rule:
+    in node order, each getting the color of smaller delta, or with
+    best_edge the (edge, color) of smallest delta among the node's
+    remaining edges at every step. Each node costs O(n**3) (O(n**4) with
+    best_edge), so a ladder of sizes costs about one run at the largest n.
+    :param scorer: K4DeltaScorer of the current coloring, grown in place
+    :param n: final number of nodes
+    :param best_edge: search the new node's edges for the best one each step
+    :param repair_passes: repair passes (see repair_node) over each new node's edges
+    :param index: optional K4Index of some K_m, m >= n, for a precomputed-mode scorer
+    :return: number of repair flips
+    """
+    flips = 0
+    for node in range(scorer.n, n):
+        scorer.grow(node + 1, index)
+        new_edges = [(i, node) for i in range(node)]
+        if best_edge:
+            while new_edges:
+                candidates = []
+                for edge in new_edges:
+                    color, delta = _best_color(scorer, edge)
+                    candidates.append((delta, edge, color))
+                _, edge, color = min(candidates)
+                scorer.color_edge(edge, color)
+                new_edges.remove(edge)
+        else:
+            for edge in new_edges:
+                scorer.color_edge(edge, _best_color(scorer, edge)[0])
+        if repair_passes:
+            flips += repair_node(scorer, node, repair_passes)
+    return flips
+
+
+def vertex_ladder(n_max, n_min=4, start=None, best_edge=False, repair_passes=0, lazy=True):
+    """
+    Colorings of every K_n from n_min to n_max, each grown from the previous one.
+    :param start: coloring matrix of some K_m to grow from, m <= n_min (empty K_1 by default)
+    :return: generator of (n, scorer, seconds spent on this size); the scorer
+             is reused, copy its matrix to keep a size
+    """
+    scorer = K4DeltaScorer(1, lazy) if start is None else scorer_from_matrix(start, lazy)
+    for n in range(scorer.n + 1 if scorer.n >= n_min else n_min, n_max + 1):
+        start_time = time.perf_counter()
+        extend_coloring(scorer, n, best_edge, repair_passes)
+        yield n, scorer, time.perf_counter() - start_time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Color K_n for every n up to N, growing one node at a time.")
+    parser.add_argument("n_max", type=int)
+    parser.add_argument("--n-min", type=int, default=4, help="first size reported")
+    parser.add_argument("--start", help="coloring_io file holding the K_m coloring to grow from")
+    parser.add_argument("--best-edge", action="store_true", help="best-edge search among each new node's edges")
+    parser.add_argument("--repair", type=int, default=0, metavar="PASSES", help="repair passes per new node")
+    parser.add_argument("--save-colorings", help="append every coloring to this coloring_io file")
+    args = parser.parse_args(argv)
+
+    start = stored_matrix(load_coloring(args.start)) if args.start else None
+    algorithm = "extension" + ("/best_edge" if args.best_edge else "") + (f"/repair{args.repair}" if args.repair else "")
+
+    start_time = time.time()
+    for n, scorer, seconds in vertex_ladder(args.n_max, args.n_min, start, args.best_edge, args.repair):
+        # The coloring is complete, so the expectation is the monochromatic K4 count
+        mono = round(scorer.score)
+        print(f"n={n:<4d} mono={mono:<8d} bound={math.comb(n, 4) / 32:.1f} {seconds:.3f}s")
+        if args.save_colorings:
+            save_coloring(args.save_colorings, scorer.matrix, algorithm, mono_k4=mono, append=True)
+    print(f"total {time.time() - start_time:.3f} seconds")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+from itertools import combinations
+import math
+import time
+
+import numpy as np
+
+from instrumentation import Instrumentation, print_progress
+from k4_scorer import K4DeltaScorer, K4_GAINS
+
+# The best-edge greedy first ran on an indexed heap of gains, hence the
+# module name, which colorers, benchmark tables and job server requests
+# still use. There is no priority queue any more: each step is an
+# np.argmin over a gain table updated in bulk.
+
+# K4_GAINS rows by count_0 * 7 + count_1
+FLAT_GAINS = K4_GAINS.reshape(49, 2)
+
+
+def heap_greedy_coloring(n, lazy=None, instrumentation=None, index=None, seed=None, initial=0):
+    """
+    Best-edge greedy coloring driven by a table of (edge, color) gains,
+    picking each step's (edge, color) with np.argmin over it.
+
+    Each step takes the (edge, color) whose coloring raises the expected
+    number of monochromatic K4s the least. After the commit, only the gains
+    of edges sharing one of the C(n-2, 2) K4s through the colored edge
+    change; they are built as one n x n matrix and added to the table in a
+    few NumPy passes instead of rescanning every uncolored edge for both
+    colors, so a step is O(n**2) array work and a whole run O(n**4).
+    :param n: number of nodes of the complete graph
+    :param lazy: K4DeltaScorer mode, None to choose by n
+    :param instrumentation: optional Instrumentation for counters, timers and progress
+    :param index: optional K4Index of some K_m, m >= n, to reuse (see K4Index.prefix)
+    :param seed: break ties between equal gains at random with this seed
+                 instead of by (edge, color)
+    :param initial: number of random edges colored at random before the
+                    greedy starts (needs a seed)
+    :return: (colorings, number of monochromatic K4s)
+    """
+    setup_start = time.perf_counter()
+    scorer = K4DeltaScorer(n, lazy, instrumentation, index)
+    rng = None if seed is None else np.random.default_rng(seed)
+    if initial:
+        if rng is None:
+            raise ValueError("random initial edges need a seed")
+        for e in rng.choice(scorer.num_edges, size=min(initial, scorer.num_edges), replace=False):
+            scorer.color_edge(scorer.edge_list[e], int(rng.integers(2)))
+
+    # gains[u, v, color] for u < v, +inf below the diagonal and for colored
+    # edges; row-major order makes the first minimum np.argmin finds the
+    # smallest (edge, color)
+    gains = np.full((n, n, 2), np.inf)
+    for edge in combinations(range(n), 2):
+        if edge in scorer.colorings:
+            continue
+        for color in (0, 1):
+            # Coloring one edge of an uncolored K4 keeps its expectation unchanged
+            gain = scorer.delta(edge, color) if initial else 0
+            # Gains are integers, so a fixed offset in [0, 1) per key only reorders ties
+            gains[edge][color] = gain if rng is None else gain + rng.random()
+
+    if instrumentation is not None:
+        instrumentation.add_time("setup", time.perf_counter() - setup_start)
+
+    while len(scorer.colorings) < scorer.num_edges:
+        if instrumentation is not None:
+            step_start = time.perf_counter()
+        u, v, color = np.unravel_index(int(np.argmin(gains)), gains.shape)
+        edge = (int(u), int(v))
+        gains[edge] = np.inf
+
+        # Gain changes of every K4 {u, v, i, j} through this edge, as an
+        # n x n matrix over i, j; rows and columns u, v and the diagonal are
+        # no K4 and are zeroed. Counts are looked up as count_0 * 7 + count_1.
+        per_node = [(scorer.matrix[u] == c).astype(np.intp) + (scorer.matrix[v] == c) for c in (0, 1)]
+        keys = 7 * (per_node[0][:, None] + per_node[0][None, :] + (scorer.matrix == 0))
+        keys += per_node[1][:, None] + per_node[1][None, :] + (scorer.matrix == 1)
+        diff = np.take(FLAT_GAINS, keys + (7 if color == 0 else 1), axis=0) - np.take(FLAT_GAINS, keys, axis=0)
+        diff[[u, v]] = diff[:, [u, v]] = diff[np.arange(n), np.arange(n)] = 0
+        scorer.color_edge(edge, int(color))
+
+        # Edge (i, j) lies in one of those K4s, edges (u, i) and (v, i) in
+        # the K4s of every j: the gains change by diff and its row sums
+        # (diff is symmetric, and summing over axis 0 is the contiguous way)
+        row_sums = diff.sum(axis=0)
+        diff[u] = diff[:, u] = diff[v] = diff[:, v] = row_sums
+        gains += diff
+        if instrumentation is not None:
+            instrumentation.count("gain_updates", int(np.count_nonzero(diff[np.isfinite(gains)])))
+            instrumentation.add_time("gains", time.perf_counter() - step_start)
+            instrumentation.progress(len(scorer.colorings), scorer.num_edges, score=scorer.score)
+
+    return scorer.colorings, scorer.mono_k4_count()
+
+
+if __name__ == "__main__":
+    n = 30
+
+    start_time = time.time()
+    instrumentation = Instrumentation(progress=print_progress)
+    colorings, same_colored_K4 = heap_greedy_coloring(n, instrumentation=instrumentation)
+    end_time = time.time()
+    print(instrumentation.summary())
+    print(end_time - start_time)
+    # Theoretical minimum same-colored K4 graphs
+    theoretical_min_K4 = math.comb(n, 4) // 32
+
+    print(same_colored_K4)
+    print(theoretical_min_K4)
+    print("########################")
@@ -1,11 +1,13 @@
 from itertools import combinations
-import networkx as nx
-import matplotlib.pyplot as plt
 import numpy as np
 import time
 
+from complete_graph import CompleteGraph
+from k4_count import colorings_to_matrix
+from render import render_coloring
+
 def optimized_greedy_coloring(n):
-    G = nx.complete_graph(n)
+    G = CompleteGraph(n)
     colorings = {}  # store the color of edges
     k4_contributions = {}  # store contribution of each K4 to the score
 
@@ -62,51 +64,21 @@ def optimized_greedy_coloring(n):
 
     return G, colorings, same_colored_K4
 
-# Test the optimized code with n = 7
-n = 20
-
-start_time = time.time()  # 记录开始时间
-G_opt, colorings_opt, same_colored_K4_count_opt = optimized_greedy_coloring(n)
-end_time = time.time()  # 记录结束时间
-elapsed_time = end_time - start_time  # 计算经过时间
-print(elapsed_time)
-# Theoretical minimum same-colored K4 graphs
-theoretical_min_K4_opt = (n*(n-1)*(n-2)*(n-3)) // (4*3*2*1) // 32
-
-print(same_colored_K4_count_opt)
-print(theoretical_min_K4_opt)
-print("########################")
-
-# Visualizing the optimized graph with colored edges
-
-pos_opt = nx.spring_layout(G_opt)  # Generate positions for the nodes
-
-
-
-# Extracting edges of each color from optimized coloring
-
-edges_color_0_opt = [(u, v) for (u, v), color in colorings_opt.items() if color == 0]
-
-edges_color_1_opt = [(u, v) for (u, v), color in colorings_opt.items() if color == 1]
-
-
-
-# Drawing the graph
-
-plt.figure(figsize=(8, 6))
-
-nx.draw_networkx_nodes(G_opt, pos_opt, node_size=700, node_color='lightgrey', edgecolors='black')
-
-nx.draw_networkx_labels(G_opt, pos_opt)
-
-nx.draw_networkx_edges(G_opt, pos_opt, edgelist=edges_color_0_opt, edge_color='blue', width=2)
-
-nx.draw_networkx_edges(G_opt, pos_opt, edgelist=edges_color_1_opt, edge_color='red', width=2)
-
-
+if __name__ == "__main__":
+    # Test the optimized code with n = 7
+    n = 20
 
-plt.axis('off')
+    start_time = time.time()  # 记录开始时间
+    G_opt, colorings_opt, same_colored_K4_count_opt = optimized_greedy_coloring(n)
+    end_time = time.time()  # 记录结束时间
+    elapsed_time = end_time - start_time  # 计算经过时间
+    print(elapsed_time)
+    # Theoretical minimum same-colored K4 graphs
+    theoretical_min_K4_opt = (n*(n-1)*(n-2)*(n-3)) // (4*3*2*1) // 32
 
-plt.title('Optimized Colored Complete Graph $K_7$')
+    print(same_colored_K4_count_opt)
+    print(theoretical_min_K4_opt)
+    print("########################")
 
-plt.show()
\ No newline at end of file
+    # Visualizing the optimized graph with colored edges
+    render_coloring(colorings_to_matrix(n, colorings_opt), title='Optimized Colored Complete Graph $K_7$')
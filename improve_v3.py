@@ -1,73 +1,92 @@
-from itertools import combinations
-import networkx as nx
-import matplotlib.pyplot as plt
 import numpy as np
 import time
 
-def calculate_edge_impact(edge, color, colorings, edge_to_k4s, k4_edges):
+from complete_graph import CompleteGraph
+from checkpoint import load_checkpoint, save_checkpoint, unpack_edge_colors
+from k4_index import K4Index, edge_id
+from k4_scorer import batch_deltas
+
+# Impact of coloring an edge, in units of 2**-5, indexed by the color counts
+# of the other five edges of a K4: only a K4 whose other five edges all
+# carry the same color counts, with 2**0 - 2**-5
+V3_IMPACTS = np.zeros((7, 7, 2), dtype=np.int64)
+V3_IMPACTS[5, 0, 0] = V3_IMPACTS[0, 5, 1] = 31
+
+def edge_impacts(k4_counts, k4_edges, num_edges, ids):
     """
-    Calculate the impact of coloring an edge on the scores of affected K4s.
-    This function returns the difference in total score if this edge were colored with the given color.
+    V3_IMPACTS of the edges with the given ids for both colors, from one batch_deltas pass.
+    :return: (len(ids), 2) int64 array
     """
-    impact = 0
-    affected_k4s = edge_to_k4s[edge]
-    for k4 in affected_k4s:
-        edges = k4_edges[k4]
-        colors = [colorings.get(e, -1) for e in edges if e != edge] + [color]
-        if all(c == color for c in colors[:-1]):  # All edges same color or uncolored
-            impact += 2**(colors.count(color) - 6) - 2**-5
-    return impact
+    return batch_deltas(k4_counts, k4_edges, num_edges, V3_IMPACTS)[ids]
 
-def greedy_coloring_v3(n):
-    G = nx.complete_graph(n)
+def greedy_coloring_v3(n, checkpoint_path=None, checkpoint_interval=600, resume=None):
+    """
+    Greedy coloring picking the edge and color with the smallest impact each step.
+    :param checkpoint_path: file to checkpoint the coloring to after a step,
+                            at most every checkpoint_interval seconds
+    :param resume: Checkpoint to continue from (see resume_greedy_coloring_v3)
+    """
+    G = CompleteGraph(n)
     colorings = {}
-    edge_to_k4s = {}
-    k4_edges = {k4: list(combinations(k4, 2)) for k4 in combinations(G.nodes(), 4)}
-    
-    for k4, edges in k4_edges.items():
-        for edge in edges:
-            if edge not in edge_to_k4s:
-                edge_to_k4s[edge] = []
-            edge_to_k4s[edge].append(k4)
+    if resume is not None:
+        if resume.algorithm != "greedy_coloring_v3" or resume.n != n:
+            raise ValueError(f"checkpoint is for {resume.algorithm} with n={resume.n}")
+        edge_colors = unpack_edge_colors(resume.colored, resume.ones, n * (n - 1) // 2)
+        colorings = {edge: int(edge_colors[edge_id(*edge)]) for edge in G.edges() if edge_colors[edge_id(*edge)] >= 0}
+    # Per-K4 color counts, updated as edges are colored
+    index = K4Index(n)
+    k4_edges = index.k4_edge_ids(np.arange(index.num_k4s))
+    edge_colors = np.full(index.num_edges, -1, dtype=np.int8)
+    for edge, color in colorings.items():
+        edge_colors[edge_id(*edge)] = color
+    k4_colors = edge_colors[k4_edges]
+    k4_counts = np.column_stack([(k4_colors == 0).sum(axis=1), (k4_colors == 1).sum(axis=1)]).astype(np.uint8)
 
-    all_edges = list(G.edges())
+    all_edges = [edge for edge in G.edges() if edge not in colorings]
+    last_checkpoint = time.time()
     while all_edges:
-        best_edge = None
-        best_color = None
-        best_impact = float('inf')
-
-        # Evaluate the impact of coloring each edge
-        for edge in all_edges:
-            for color in [0, 1]:
-                impact = calculate_edge_impact(edge, color, colorings, edge_to_k4s, k4_edges)
-                if impact < best_impact:
-                    best_impact = impact
-                    best_edge = edge
-                    best_color = color
+        # Evaluate the impact of coloring each edge with either color in one pass
+        ids = np.array([edge_id(*edge) for edge in all_edges])
+        impacts = edge_impacts(k4_counts, k4_edges, index.num_edges, ids)
+        # First smallest impact in (edge, color) scan order
+        best = int(np.argmin(impacts))
+        best_edge, best_color = all_edges[best // 2], best % 2
 
         # Color the edge with the best impact
         colorings[best_edge] = best_color
         all_edges.remove(best_edge)
+        e = edge_id(*best_edge)
+        edge_colors[e] = best_color
+        k4_counts[index.k4s_of_edge(e), best_color] += 1
+
+        if checkpoint_path is not None and time.time() - last_checkpoint >= checkpoint_interval:
+            save_checkpoint(checkpoint_path, n, edge_colors, "greedy_coloring_v3")
+            last_checkpoint = time.time()
 
     # Calculate the number of same-colored K4 subgraphs
-    same_colored_K4 = 0
-    for k4, edges in k4_edges.items():
-        if len(set(colorings[edge] for edge in edges if edge in colorings)) == 1:
-            same_colored_K4 += 1
+    same_colored_K4 = int(np.count_nonzero((k4_counts == 6).any(axis=1)))
 
     return G, colorings, same_colored_K4
 
-# Test the further optimized code with a larger n to see performance improvement
-n = 8
-start_time = time.time()  # 记录开始时间
-G_opt_v3, colorings_opt_v3, same_colored_K4_count_opt_v3 = greedy_coloring_v3(n)
-end_time = time.time()  # 记录结束时间
-elapsed_time = end_time - start_time  # 计算经过时间
-print(elapsed_time)
-# Theoretical minimum same-colored K4 graphs
-theoretical_min_K4_opt_v3 = (n*(n-1)*(n-2)*(n-3)) // (4*3*2*1) // 32
+def resume_greedy_coloring_v3(checkpoint_path, checkpoint_interval=600):
+    """
+    Continue a greedy_coloring_v3 run from its checkpoint file.
+    """
+    checkpoint = load_checkpoint(checkpoint_path)
+    return greedy_coloring_v3(checkpoint.n, checkpoint_path, checkpoint_interval, resume=checkpoint)
+
+if __name__ == "__main__":
+    # Test the further optimized code with a larger n to see performance improvement
+    n = 8
+    start_time = time.time()  # 记录开始时间
+    G_opt_v3, colorings_opt_v3, same_colored_K4_count_opt_v3 = greedy_coloring_v3(n)
+    end_time = time.time()  # 记录结束时间
+    elapsed_time = end_time - start_time  # 计算经过时间
+    print(elapsed_time)
+    # Theoretical minimum same-colored K4 graphs
+    theoretical_min_K4_opt_v3 = (n*(n-1)*(n-2)*(n-3)) // (4*3*2*1) // 32
 
-G_opt_v3, colorings_opt_v3, same_colored_K4_count_opt_v3, theoretical_min_K4_opt_v3
-print(same_colored_K4_count_opt_v3)
-print(theoretical_min_K4_opt_v3)
-print("########################")
\ No newline at end of file
+    G_opt_v3, colorings_opt_v3, same_colored_K4_count_opt_v3, theoretical_min_K4_opt_v3
+    print(same_colored_K4_count_opt_v3)
+    print(theoretical_min_K4_opt_v3)
+    print("########################")
@@ -0,0 +1,98 @@
+from collections import defaultdict
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+
+
+class Instrumentation:
+    """
+    Counters, phase timers and rate-limited progress for a coloring run.
+
+    Colorers take an optional instrumentation argument and only touch it
+    behind an `is not None` check, so the default run pays nothing. Using
+    the object as a context manager additionally runs cProfile and/or
+    tracemalloc around the block when profile / trace_memory are set.
+    """
+
+    def __init__(self, progress=None, progress_interval=1.0, profile=False, trace_memory=False):
+        """
+        :param progress: callback(done, total, info dict), called at most
+                         once per progress_interval seconds
+        :param progress_interval: seconds between progress callbacks
+        :param profile: run cProfile inside the with block
+        :param trace_memory: record the tracemalloc peak inside the with block
+        """
+        self.counters = defaultdict(int)
+        self.timers = defaultdict(float)
+        self.progress_callback = progress
+        self.progress_interval = progress_interval
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.profiler = None
+        self.peak_memory = None
+        self._last_progress = float("-inf")
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def add_time(self, name, seconds):
+        self.timers[name] += seconds
+
+    def progress(self, done, total, **info):
+        """
+        Report progress, dropping calls that come sooner than progress_interval
+        after the previous report (the final done == total call always passes).
+        """
+        if self.progress_callback is None:
+            return
+        now = time.perf_counter()
+        if now - self._last_progress < self.progress_interval and done < total:
+            return
+        self._last_progress = now
+        self.progress_callback(done, total, info)
+
+    def __enter__(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.trace_memory:
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return False
+
+    def profile_report(self, limit=20, sort="cumulative"):
+        """
+        Text of the top cProfile entries, or "" when profiling was off.
+        """
+        if self.profiler is None:
+            return ""
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def summary(self):
+        """
+        Counters, timers and peak memory as one plain dict.
+        """
+        summary = dict(self.counters)
+        summary.update({f"{name}_seconds": seconds for name, seconds in self.timers.items()})
+        if self.peak_memory is not None:
+            summary["peak_memory_bytes"] = self.peak_memory
+        return summary
+
+
+def print_progress(done, total, info):
+    """
+    Progress callback printing one line per report.
+    """
+    extra = " ".join(f"{key}={value}" for key, value in info.items())
+    print(f"{done / total * 100:6.2f}% ({done}/{total}) {extra}")
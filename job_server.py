@@ -0,0 +1,282 @@
+import argparse
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+import io
+import json
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from coloring_io import load_coloring, save_coloring
+from colorers import COLORERS, INSTRUMENTED_COLORERS, run_colorer
+from instrumentation import Instrumentation
+from k4_count import count_k4_mono
+
+# Protocol: a client connects, sends one JSON line
+#   {"algorithm": "heap_greedy", "n": 40, "seed": 0}
+# and receives JSON lines until the connection closes:
+#   {"event": "queued", "key": ..., "shared": true if an identical job was already running}
+#   {"event": "progress", "done": ..., "total": ...}   (instrumented colorers only)
+#   {"event": "done", "cached": ..., "path": ..., "mono_k4": ..., "seconds": ...}
+#   {"event": "error", "message": ...}
+DEFAULT_PORT = 8765
+PROGRESS_INTERVAL = 0.5
+
+
+def job_key(algorithm, n, seed):
+    return f"{algorithm}-{n}-{'none' if seed is None else seed}"
+
+
+class ResultCache:
+    """
+    Finished colorings as coloring_io files in one directory, evicting the
+    least recently used files once they take more than max_bytes.
+
+    Recency survives restarts through the files' modification times, which
+    every hit refreshes.
+    """
+
+    def __init__(self, directory, max_bytes=1 << 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        files = [name for name in os.listdir(directory) if name.endswith(".k4c")]
+        files.sort(key=lambda name: os.path.getmtime(os.path.join(directory, name)))
+        self._entries = OrderedDict((name[:-4], os.path.getsize(os.path.join(directory, name))) for name in files)
+        self.size = sum(self._entries.values())
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.k4c")
+
+    def get(self, key):
+        """
+        Path of the cached coloring, or None (also when its file was removed
+        behind the cache's back).
+        """
+        if key not in self._entries:
+            return None
+        try:
+            os.utime(self.path(key))
+        except FileNotFoundError:
+            self.size -= self._entries.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return self.path(key)
+
+    def put(self, key, matrix, algorithm, seed, mono_k4):
+        """
+        Store a coloring (written next to its final name and renamed, so
+        readers never see a partial file) and evict down to max_bytes.
+        """
+        path = self.path(key)
+        save_coloring(f"{path}.tmp", matrix, algorithm, seed, mono_k4)
+        os.replace(f"{path}.tmp", path)
+        self.size += os.path.getsize(path) - self._entries.pop(key, 0)
+        self._entries[key] = os.path.getsize(path)
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            old_key, old_size = self._entries.popitem(last=False)
+            self.size -= old_size
+            try:
+                os.remove(self.path(old_key))
+            except FileNotFoundError:
+                pass
+        return path
+
+
+def _run_job(algorithm, n, seed, key, progress):
+    # Runs in a worker process; progress reports go back through a manager queue
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    instrumentation = None
+    if algorithm in INSTRUMENTED_COLORERS:
+        instrumentation = Instrumentation(progress=lambda done, total, info: progress.put((key, done, total)),
+                                          progress_interval=PROGRESS_INTERVAL)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        matrix = run_colorer(algorithm, n, instrumentation=instrumentation)
+    seconds = time.perf_counter() - start
+    return matrix, sum(count_k4_mono(matrix)), seconds
+
+
+class JobServer:
+    """
+    Runs coloring requests on a process pool.
+
+    Identical (algorithm, n, seed) requests share one running job and all
+    receive its progress; finished colorings are served from a ResultCache.
+    """
+
+    def __init__(self, cache, workers=None):
+        self.cache = cache
+        # Forked workers would inherit the open client sockets and keep them
+        # from closing, so workers are started fresh
+        self._pool = ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn"))
+        self._manager = mp.Manager()
+        self._progress = self._manager.Queue()
+        self._jobs = {}  # key -> asyncio.Task of the running job
+        self._subscribers = {}  # key -> set of asyncio.Queue receiving its progress events
+        self._forwarder = None
+
+    async def start(self):
+        self._forwarder = asyncio.ensure_future(self._forward_progress())
+
+    async def close(self):
+        self._progress.put(None)
+        if self._forwarder is not None:
+            await self._forwarder
+        self._pool.shutdown(cancel_futures=True)
+        self._manager.shutdown()
+
+    async def _forward_progress(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await loop.run_in_executor(None, self._progress.get)
+            if item is None:
+                return
+            key, done, total = item
+            for queue in self._subscribers.get(key, ()):
+                queue.put_nowait({"event": "progress", "done": done, "total": total})
+
+    async def _run(self, key, algorithm, n, seed):
+        loop = asyncio.get_running_loop()
+        matrix, mono_k4, seconds = await loop.run_in_executor(self._pool, _run_job, algorithm, n, seed, key,
+                                                              self._progress)
+        path = self.cache.put(key, matrix, algorithm, seed, mono_k4)
+        return {"event": "done", "cached": False, "path": path, "mono_k4": mono_k4, "seconds": seconds}
+
+    def submit(self, algorithm, n, seed=None):
+        """
+        The task computing (algorithm, n, seed), joining an identical running one.
+        :return: (key, asyncio.Task, whether the task was already running)
+        """
+        key = job_key(algorithm, n, seed)
+        task = self._jobs.get(key)
+        if task is not None:
+            return key, task, True
+        task = asyncio.ensure_future(self._run(key, algorithm, n, seed))
+        self._jobs[key] = task
+        task.add_done_callback(lambda _: self._jobs.pop(key, None))
+        return key, task, False
+
+    async def handle(self, reader, writer):
+        async def send(message):
+            writer.write(json.dumps(message).encode() + b"\n")
+            await writer.drain()
+
+        try:
+            try:
+                request = json.loads(await reader.readline())
+                algorithm, n, seed = request["algorithm"], int(request["n"]), request.get("seed")
+                if algorithm not in COLORERS:
+                    raise ValueError(f"unknown algorithm {algorithm!r}")
+                if n < 2:
+                    raise ValueError("n must be at least 2")
+                seed = None if seed is None else int(seed)
+            except (ValueError, KeyError, TypeError) as e:
+                await send({"event": "error", "message": f"bad request: {e}"})
+                return
+
+            key = job_key(algorithm, n, seed)
+            path = self.cache.get(key)
+            if path is not None:
+                await send({"event": "done", "cached": True, "path": path, "mono_k4": load_coloring(path).mono_k4,
+                            "seconds": 0.0})
+                return
+
+            key, task, shared = self.submit(algorithm, n, seed)
+            queue = asyncio.Queue()
+            self._subscribers.setdefault(key, set()).add(queue)
+            try:
+                await send({"event": "queued", "key": key, "shared": shared})
+                while not task.done():
+                    get = asyncio.ensure_future(queue.get())
+                    await asyncio.wait({get, task}, return_when=asyncio.FIRST_COMPLETED)
+                    if get.done():
+                        await send(get.result())
+                    else:
+                        get.cancel()
+            finally:
+                self._subscribers[key].discard(queue)
+                if not self._subscribers[key]:
+                    del self._subscribers[key]
+            try:
+                await send(task.result())
+            except Exception as e:
+                await send({"event": "error", "message": f"{type(e).__name__}: {e}"})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, workers=None, cache_dir="coloring_cache",
+                max_bytes=1 << 30):
+    server = JobServer(ResultCache(cache_dir, max_bytes), workers)
+    await server.start()
+    try:
+        listener = await asyncio.start_server(server.handle, host, port)
+        async with listener:
+            print(f"serving on {host}:{port}, cache in {os.path.abspath(cache_dir)}")
+            await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+async def request_coloring(algorithm, n, seed=None, host="127.0.0.1", port=DEFAULT_PORT, on_event=None):
+    """
+    Ask a running job server for a coloring.
+    :param on_event: optional callback receiving every event dict as it arrives
+    :return: the final "done" or "error" event
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(json.dumps({"algorithm": algorithm, "n": n, "seed": seed}).encode() + b"\n")
+        await writer.drain()
+        event = None
+        while True:
+            line = await reader.readline()
+            if not line:
+                return event
+            event = json.loads(line)
+            if on_event is not None:
+                on_event(event)
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local coloring job server with a deduplicating result cache.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run the server")
+    serve_parser.add_argument("--workers", type=int, help="worker processes (default: all CPUs)")
+    serve_parser.add_argument("--cache-dir", default="coloring_cache")
+    serve_parser.add_argument("--cache-size", type=int, default=1024, help="cache limit in MiB")
+    submit_parser = commands.add_parser("submit", help="request a coloring and print its events")
+    submit_parser.add_argument("algorithm", choices=sorted(COLORERS))
+    submit_parser.add_argument("n", type=int)
+    submit_parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.host, args.port, args.workers, args.cache_dir, args.cache_size << 20))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    event = asyncio.run(request_coloring(args.algorithm, args.n, args.seed, args.host, args.port,
+                                         lambda event: print(json.dumps(event))))
+    return 0 if event is not None and event["event"] == "done" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+from itertools import combinations
+import math
+from time import time
+
+import numpy as np
+
+
+def colorings_to_matrix(n, colorings):
+    """
+    Convert a {(u, v): color} dict into an n x n int8 matrix, -1 for uncolored.
+    """
+    coloring = np.full((n, n), -1, dtype=np.int8)
+    for (u, v), color in colorings.items():
+        coloring[u, v] = coloring[v, u] = color
+    return coloring
+
+
+def color_adjacency(coloring, color):
+    """
+    Adjacency matrix of one color class, as float32 so products go through
+    BLAS; the entries of B @ B are at most n and stay exact, sums over them
+    have to be taken in a wider type.
+    """
+    return (coloring == color).astype(np.float32)
+
+
+def count_k4(adjacency):
+    """
+    Count the K4s of a graph given by its 0/1 adjacency matrix.
+
+    Every K4 is counted once at its smallest node u, as a triangle inside
+    the higher-indexed neighborhood N+(u); the triangles of a subgraph with
+    adjacency B are sum((B @ B) * B) / 6.
+    :param adjacency: n x n float32 0/1 matrix
+    :return: int
+    """
+    n = len(adjacency)
+    total = 0
+    for u in range(n - 3):
+        higher = np.flatnonzero(adjacency[u, u + 1:]) + u + 1
+        if len(higher) < 3:
+            continue
+        sub = adjacency[np.ix_(higher, higher)]
+        # 6 x the triangle count passes 2**24 around n = 300: sum in float64
+        total += int(round(float(((sub @ sub) * sub).sum(dtype=np.float64)))) // 6
+    return total
+
+
+def count_k4_per_edge(adjacency):
+    """
+    Number of K4s through every edge of a graph given by its adjacency matrix.
+
+    The K4s through edge (u, v) are the edges inside N(u) & N(v); with B the
+    adjacency restricted to N(u), that is the diagonal of B @ B @ B at v / 2.
+    :param adjacency: n x n float32 0/1 matrix
+    :return: n x n int64 symmetric matrix
+    """
+    n = len(adjacency)
+    per_edge = np.zeros((n, n), dtype=np.int64)
+    for u in range(n):
+        neighbors = np.flatnonzero(adjacency[u])
+        if len(neighbors) < 3:
+            continue
+        sub = adjacency[np.ix_(neighbors, neighbors)]
+        per_edge[u, neighbors] = np.rint(((sub @ sub) * sub).sum(axis=1)).astype(np.int64) // 2
+    return per_edge
+
+
+def count_k4_mono(coloring):
+    """
+    Count the monochromatic K4s of a 2-colored complete graph.
+    :param coloring: n x n int8 matrix, -1 for uncolored edges
+    :return: (K4s of color 0, K4s of color 1)
+    """
+    return tuple(count_k4(color_adjacency(coloring, color)) for color in (0, 1))
+
+
+def count_k4_mono_per_edge(coloring):
+    """
+    Number of monochromatic K4s through every edge of a 2-colored complete graph.
+    :param coloring: n x n int8 matrix, -1 for uncolored edges
+    :return: n x n int64 symmetric matrix
+    """
+    return sum(count_k4_per_edge(color_adjacency(coloring, color)) for color in (0, 1))
+
+
+def count_k4_mono_bruteforce(coloring):
+    """
+    Reference count over all C(n, 4) quadruples, for checking on small n.
+    """
+    counts = [0, 0]
+    for k4 in combinations(range(len(coloring)), 4):
+        colors = {int(coloring[u, v]) for u, v in combinations(k4, 2)}
+        if len(colors) == 1 and -1 not in colors:
+            counts[colors.pop()] += 1
+    return tuple(counts)
+
+
+if __name__ == "__main__":
+    nodes_num = 500
+    rng = np.random.default_rng(0)
+    coloring = np.triu(rng.integers(0, 2, size=(nodes_num, nodes_num), dtype=np.int8), 1)
+    coloring = coloring + coloring.T
+    np.fill_diagonal(coloring, -1)
+
+    start_time = time()
+    num_k4 = count_k4_mono(coloring)
+    end_time = time()
+    print(f"{nodes_num} nodes, random coloring expects {math.comb(nodes_num, 4) / 32} monochromatic K4 complete graphs, counted {sum(num_k4)} {num_k4}")
+    print(f"Elapsed time: {end_time - start_time} seconds")
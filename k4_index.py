@@ -0,0 +1,136 @@
+import math
+
+import numpy as np
+
+# Edges and K4s are numbered in colexicographic order, so the ids of K_n
+# are exactly the first ids of K_{n+1}:
+#   edge {i < j}          -> C(j, 2) + i
+#   K4 {a < b < c < d}    -> C(a, 1) + C(b, 2) + C(c, 3) + C(d, 4)
+# (the combinatorial number system).
+
+
+def edge_id(u, v):
+    """
+    Triangular integer id of the edge {u, v}.
+    """
+    if u > v:
+        u, v = v, u
+    return v * (v - 1) // 2 + u
+
+
+def k4_rank(nodes):
+    """
+    Combinatorial-number-system rank of a K4 given by its four nodes.
+    """
+    a, b, c, d = sorted(nodes)
+    return a + math.comb(b, 2) + math.comb(c, 3) + math.comb(d, 4)
+
+
+def colex_combinations(n, k):
+    """
+    All k-subsets of range(n) in colex order, one sorted subset per row.
+    """
+    if k == 0:
+        return np.zeros((1, 0), dtype=np.int64)
+    base = colex_combinations(n - 1, k - 1) if n > 0 else np.zeros((0, k - 1), dtype=np.int64)
+    blocks = [np.zeros((0, k), dtype=np.int64)]
+    for top in range(k - 1, n):
+        prefix = base[:math.comb(top, k - 1)]
+        blocks.append(np.column_stack([prefix, np.full(len(prefix), top, dtype=np.int64)]))
+    return np.concatenate(blocks)
+
+
+def binomial_table(n, k):
+    """
+    table[x] = C(x, k) for x in range(n), as int64.
+    """
+    return np.array([math.comb(x, k) for x in range(n)], dtype=np.int64)
+
+
+def k4_ranks_through(n, u, v, tables=None):
+    """
+    Ranks of the C(n-2, 2) K4s of K_n containing edge {u, v}, in increasing order.
+    """
+    if tables is None:
+        tables = [binomial_table(n, k) for k in range(1, 5)]
+    others = np.array([w for w in range(n) if w != u and w != v], dtype=np.int64)
+    i, j = np.triu_indices(len(others), 1)
+    nodes = np.column_stack([others[i], others[j],
+                             np.full(len(i), u, dtype=np.int64), np.full(len(i), v, dtype=np.int64)])
+    nodes.sort(axis=1)
+    ranks = sum(tables[k][nodes[:, k]] for k in range(4))
+    ranks.sort()
+    return ranks
+
+
+class K4Index:
+    """
+    Integer indexing of the edges and K4s of K_n backed by NumPy arrays.
+
+    edges[e]           -- (u, v) with u < v of edge id e
+    k4_nodes[q]        -- sorted nodes of the K4 of rank q (uint16)
+    k4_indptr/indices  -- CSR edge -> K4 incidence; the K4s through edge e
+                          are k4_indices[k4_indptr[e]:k4_indptr[e + 1]]
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.num_edges = math.comb(n, 2)
+        self.num_k4s = math.comb(n, 4)
+        # int32 ranks are enough up to n = 477
+        rank_dtype = np.int32 if self.num_k4s < 2**31 else np.int64
+
+        self.edges = colex_combinations(n, 2).astype(np.int32)
+        self.edge_list = [tuple(edge) for edge in self.edges.tolist()]
+        self.k4_nodes = colex_combinations(n, 4).astype(np.uint16)
+
+        per_edge = math.comb(max(n - 2, 0), 2)
+        self.k4_indptr = np.arange(self.num_edges + 1, dtype=np.int64) * per_edge
+        self.k4_indices = np.empty(self.num_edges * per_edge, dtype=rank_dtype)
+        tables = [binomial_table(n, k) for k in range(1, 5)]
+        for e, (u, v) in enumerate(self.edge_list):
+            self.k4_indices[e * per_edge:(e + 1) * per_edge] = k4_ranks_through(n, u, v, tables)
+
+    def prefix(self, n):
+        """
+        K4Index of K_n for n <= self.n, sliced out of this one.
+
+        Colex ids make the edges and K4s of K_n the first ids of the larger
+        index, and the K4s of K_n through an edge are the smallest ranks of
+        its CSR row, so nothing is rebuilt.
+        """
+        if n > self.n:
+            raise ValueError(f"cannot take a prefix of size {n} from an index of size {self.n}")
+        if n == self.n:
+            return self
+        index = K4Index.__new__(K4Index)
+        index.n = n
+        index.num_edges = math.comb(n, 2)
+        index.num_k4s = math.comb(n, 4)
+        index.edges = self.edges[:index.num_edges]
+        index.edge_list = self.edge_list[:index.num_edges]
+        index.k4_nodes = self.k4_nodes[:index.num_k4s]
+
+        per_edge = math.comb(max(n - 2, 0), 2)
+        rows = self.k4_indices.reshape(self.num_edges, math.comb(max(self.n - 2, 0), 2))
+        index.k4_indptr = np.arange(index.num_edges + 1, dtype=np.int64) * per_edge
+        index.k4_indices = rows[:index.num_edges, :per_edge].ravel()
+        return index
+
+    def edge_id(self, u, v):
+        return edge_id(u, v)
+
+    def k4s_of_edge(self, e):
+        """
+        Ranks of the K4s through edge id e (a view into the CSR indices).
+        """
+        return self.k4_indices[self.k4_indptr[e]:self.k4_indptr[e + 1]]
+
+    def k4_edge_ids(self, ranks):
+        """
+        The six edge ids of each given K4, as an (len(ranks), 6) int64 array.
+        """
+        nodes = self.k4_nodes[ranks].astype(np.int64)
+        lo = nodes[:, [0, 0, 0, 1, 1, 2]]
+        hi = nodes[:, [1, 2, 3, 2, 3, 3]]
+        return hi * (hi - 1) // 2 + lo
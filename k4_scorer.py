@@ -0,0 +1,394 @@
+import math
+import time
+
+import numpy as np
+
+from k4_count import count_k4_mono
+from k4_index import K4Index, colex_combinations, edge_id
+
+# Scores are kept as integers in units of 2**-6 so every delta is exact.
+# An uncolored K4 is monochromatic with probability 2 * 2**-6, a K4 holding
+# m edges of a single color with probability 2**(m - 6), and a K4 holding
+# both colors can no longer become monochromatic.
+UNIT = 2**-6
+
+
+def edge_ids(u, v):
+    """
+    Vectorized edge_id over arrays of endpoints.
+    """
+    lo = np.minimum(u, v)
+    hi = np.maximum(u, v)
+    return hi * (hi - 1) // 2 + lo
+
+
+def k4_weight(counts):
+    """
+    Expected monochromatic contribution of a K4, in units of 2**-6.
+    :param counts: (edges colored 0, edges colored 1) inside the K4
+    :return: int
+    """
+    count_0, count_1 = counts
+    if count_0 and count_1:
+        return 0
+    same = count_0 + count_1
+    return 2**same if same else 2
+
+
+def k4_gain(counts, color):
+    """
+    Change of k4_weight when one more edge of the K4 gets the given color.
+    """
+    after = [counts[0], counts[1]]
+    after[color] += 1
+    return k4_weight(after) - k4_weight(counts)
+
+
+# Lookup tables indexed by the per-K4 color counts, for vectorized scoring
+K4_WEIGHTS = np.array([[k4_weight((a, b)) for b in range(8)] for a in range(8)], dtype=np.int64)
+K4_GAINS = np.array([[[k4_gain((a, b), color) for color in (0, 1)] for b in range(7)] for a in range(7)],
+                    dtype=np.int64)
+
+def other_nodes(n, edge):
+    """
+    The n - 2 nodes outside an edge, in increasing order.
+    """
+    u, v = sorted(edge)
+    others = np.arange(n - 2)
+    others[u:] += 1
+    others[others >= v] += 1
+    return others
+
+
+def k4_counts_from_matrix(matrix, edge, pairs=None):
+    """
+    Colored-edge counts per color of the K4s through an edge, read off a color matrix.
+
+    The K4s through (u, v) are the pairs {i, j} outside the edge, taken in
+    np.triu_indices(n - 2, 1) order over other_nodes(n, edge).
+    :param matrix: n x n int8 color matrix, -1 for uncolored edges
+    :param edge: tuple (node1, node2)
+    :param pairs: optional cached np.triu_indices(n - 2, 1)
+    :return: (C(n-2, 2), 2) uint8 array
+    """
+    n = len(matrix)
+    u, v = edge
+    if pairs is None:
+        pairs = np.triu_indices(max(n - 2, 0), 1)
+    others = other_nodes(n, edge)
+    ii, jj = pairs
+    pair_colors = matrix[others[ii], others[jj]]
+    counts = np.empty((len(ii), 2), dtype=np.uint8)
+    for color in (0, 1):
+        per_node = (matrix[u, others] == color).astype(np.uint8) + (matrix[v, others] == color)
+        counts[:, color] = per_node[ii] + per_node[jj] + (pair_colors == color)
+        if matrix[u, v] == color:
+            counts[:, color] += 1
+    return counts
+
+
+def k4_edge_ids_from_pairs(n, edge, pairs=None):
+    """
+    The six edge ids of each K4 through an edge, in k4_counts_from_matrix order.
+    Column 0 is the edge itself.
+    """
+    u, v = edge
+    if pairs is None:
+        pairs = np.triu_indices(max(n - 2, 0), 1)
+    others = other_nodes(n, edge)
+    i, j = others[pairs[0]], others[pairs[1]]
+    return np.column_stack([np.full(len(i), edge_id(u, v)),
+                            edge_ids(u, i), edge_ids(u, j), edge_ids(v, i), edge_ids(v, j),
+                            edge_ids(i, j)])
+
+
+def batch_deltas(k4_counts, k4_edges, num_edges, gains=K4_GAINS):
+    """
+    Delta of every edge for both colors at once, from per-K4 state arrays.
+
+    The gain of coloring an uncolored edge of a K4 depends only on the K4's
+    color counts, so one lookup per K4 and a scatter-add (np.bincount) over
+    its six edge ids sums the deltas of all edges together.
+    :param k4_counts: (num_k4s, 2) colored-edge counts per color of each K4
+    :param k4_edges: (num_k4s, 6) edge ids of each K4
+    :param num_edges: number of edge ids
+    :param gains: integer gain table indexed [count_0, count_1, color]
+    :return: (num_edges, 2) int64 array; rows of colored edges are meaningless
+    """
+    per_k4 = gains[k4_counts[:, 0], k4_counts[:, 1]]
+    flat = np.asarray(k4_edges).ravel()
+    return np.column_stack([
+        np.bincount(flat, weights=np.repeat(per_k4[:, color], 6), minlength=num_edges)
+        for color in (0, 1)
+    ]).astype(np.int64)
+
+
+# K4s handled per block when rebuilding the precomputed state
+K4_CHUNK = 1 << 20
+
+# Above this size the precomputed K4 table no longer pays for its O(n**4) memory
+LAZY_MIN_N = 100
+
+
+class K4DeltaScorer:
+    """
+    Running conditional expectation of the number of monochromatic K4s.
+
+    Coloring edge (u, v) only changes the C(n-2, 2) K4s through it, so
+    delta(), trial(), commit() and rollback() cost O(n**2) each instead of
+    re-summing all C(n, 4) K4 contributions.
+
+    In precomputed mode the per-K4 state is two uint8 colored-edge counts,
+    addressed through the integer K4Index (O(n**4) memory). In lazy mode no
+    K4 table exists: the K4s through (u, v) are the pairs {i, j} outside the
+    edge, and their counts are read off the n x n color matrix on demand
+    (O(n**2) memory). Both modes give identical scores; by default the lazy
+    mode is used from n = LAZY_MIN_N on.
+
+    A precomputed K4Index of any K_m with m >= n can be passed in as index;
+    its prefix for K_n is used instead of building a new one.
+    """
+
+    def __init__(self, n, lazy=None, instrumentation=None, index=None):
+        self.n = n
+        self.instrumentation = instrumentation  # optional Instrumentation, None costs nothing
+        self.lazy = n >= LAZY_MIN_N if lazy is None else lazy
+        self.colorings = {}  # store the color of edges
+        self.edges = colex_combinations(n, 2)
+        self.edge_list = [tuple(edge) for edge in self.edges.tolist()]
+        self.num_edges = len(self.edge_list)
+        self.edge_colors = np.full(self.num_edges, -1, dtype=np.int8)
+        self.matrix = np.full((n, n), -1, dtype=np.int8)
+        if self.lazy:
+            self.index = None
+            self._pairs = np.triu_indices(max(n - 2, 0), 1)
+        else:
+            self.index = K4Index(n) if index is None else index.prefix(n)
+            self.k4_counts = np.zeros((self.index.num_k4s, 2), dtype=np.uint8)
+        self.total = 2 * math.comb(n, 4)
+        self._trial = None
+
+    @property
+    def score(self):
+        return self.total * UNIT
+
+    def k4s_through(self, edge):
+        """
+        Ranks of the K4s containing the given edge (precomputed mode only).
+        """
+        return self.index.k4s_of_edge(edge_id(*edge))
+
+    def k4_counts_through(self, edge):
+        """
+        Colored-edge counts per color, shape (C(n-2, 2), 2), of the K4s through an edge.
+        """
+        if not self.lazy:
+            return self.k4_counts[self.k4s_through(edge)]
+        return k4_counts_from_matrix(self.matrix, edge, self._pairs)
+
+    def k4_edge_ids_through(self, edge):
+        """
+        The six edge ids of each K4 through an edge, in k4_counts_through order.
+        """
+        if not self.lazy:
+            return self.index.k4_edge_ids(self.k4s_through(edge))
+        return k4_edge_ids_from_pairs(self.n, edge, self._pairs)
+
+    def delta(self, edge, color):
+        """
+        Exact change of the total (in units of 2**-6) if the edge were colored.
+        """
+        if edge in self.colorings:
+            raise ValueError(f"edge {edge} is already colored")
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            start = time.perf_counter()
+        counts = self.k4_counts_through(edge)
+        delta = int(K4_GAINS[counts[:, 0], counts[:, 1], color].sum())
+        if instrumentation is not None:
+            instrumentation.count("deltas")
+            instrumentation.add_time("scoring", time.perf_counter() - start)
+        return delta
+
+    def _apply(self, edge, color, step):
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            start = time.perf_counter()
+        counts = self.k4_counts_through(edge)
+        before = K4_WEIGHTS[counts[:, 0], counts[:, 1]].sum()
+        if step > 0:
+            counts[:, color] += 1
+        else:
+            counts[:, color] -= 1
+        if not self.lazy:
+            self.k4_counts[self.k4s_through(edge)] = counts
+        delta = int(K4_WEIGHTS[counts[:, 0], counts[:, 1]].sum() - before)
+        self.total += delta
+        if instrumentation is not None:
+            instrumentation.count("k4_updates", len(counts))
+            instrumentation.add_time("scoring", time.perf_counter() - start)
+        return delta
+
+    def _set_color(self, edge, color):
+        u, v = edge
+        self.edge_colors[edge_id(u, v)] = color
+        self.matrix[u, v] = self.matrix[v, u] = color
+
+    def trial(self, edge, color):
+        """
+        Tentatively color an edge and return the resulting score.
+        The trial must be followed by commit() or rollback().
+        """
+        if self._trial is not None:
+            raise RuntimeError("a trial is already pending, commit or roll it back first")
+        if edge in self.colorings:
+            raise ValueError(f"edge {edge} is already colored")
+        self._apply(edge, color, 1)
+        self.colorings[edge] = color
+        self._set_color(edge, color)
+        self._trial = (edge, color)
+        if self.instrumentation is not None:
+            self.instrumentation.count("trials")
+        return self.score
+
+    def commit(self):
+        """
+        Keep the pending trial and return its (edge, color).
+        """
+        if self._trial is None:
+            raise RuntimeError("no pending trial to commit")
+        trial, self._trial = self._trial, None
+        if self.instrumentation is not None:
+            self.instrumentation.count("commits")
+        return trial
+
+    def rollback(self):
+        """
+        Undo the pending trial.
+        """
+        if self._trial is None:
+            raise RuntimeError("no pending trial to roll back")
+        edge, color = self._trial
+        self._trial = None
+        self._apply(edge, color, -1)
+        if self.instrumentation is not None:
+            self.instrumentation.count("rollbacks")
+        del self.colorings[edge]
+        self._set_color(edge, -1)
+
+    def color_edge(self, edge, color):
+        """
+        Permanently color an edge and return the resulting score.
+        """
+        score = self.trial(edge, color)
+        self.commit()
+        return score
+
+    def load(self, edge_colors, total=None):
+        """
+        Replace the coloring with the given per-edge colors (edge id order,
+        -1 uncolored) and rebuild the incremental state in bulk, without
+        replaying the individual decisions.
+        :param total: known running total; recomputed over all K4s if None
+        """
+        if self._trial is not None:
+            raise RuntimeError("a trial is pending, commit or roll it back first")
+        edge_colors = np.asarray(edge_colors, dtype=np.int8)
+        self.edge_colors[:] = edge_colors
+        colored = np.flatnonzero(edge_colors >= 0)
+        self.colorings.clear()
+        self.colorings.update((self.edge_list[e], int(edge_colors[e])) for e in colored)
+        self.matrix[:] = -1
+        u, v = self.edges[:, 0], self.edges[:, 1]
+        self.matrix[u, v] = self.matrix[v, u] = edge_colors
+
+        if not self.lazy:
+            self._rebuild_counts()
+        self.total = self._recount_total() if total is None else total
+
+    def grow(self, n, index=None):
+        """
+        Add nodes up to n - 1 with all their edges uncolored.
+
+        Colex ids keep every edge id and K4 rank of the current graph, so the
+        coloring and the per-K4 state carry over and only the new K4s, each
+        containing a new node, are counted in.
+        :param n: new number of nodes, at least the current one
+        :param index: optional K4Index of some K_m, m >= n, to reuse (see K4Index.prefix)
+        """
+        if self._trial is not None:
+            raise RuntimeError("a trial is pending, commit or roll it back first")
+        old_n = self.n
+        if n < old_n:
+            raise ValueError(f"cannot shrink K_{old_n} to K_{n}")
+        self.n = n
+        self.edges = colex_combinations(n, 2)
+        self.edge_list.extend(tuple(edge) for edge in self.edges[self.num_edges:].tolist())
+        self.edge_colors = np.concatenate([self.edge_colors,
+                                           np.full(len(self.edges) - self.num_edges, -1, dtype=np.int8)])
+        self.num_edges = len(self.edge_list)
+        matrix = np.full((n, n), -1, dtype=np.int8)
+        matrix[:old_n, :old_n] = self.matrix
+        self.matrix = matrix
+        if self.lazy:
+            self._pairs = np.triu_indices(max(n - 2, 0), 1)
+        else:
+            self.index = K4Index(n) if index is None else index.prefix(n)
+            k4_counts = np.zeros((self.index.num_k4s, 2), dtype=np.uint8)
+            k4_counts[:len(self.k4_counts)] = self.k4_counts
+            self.k4_counts = k4_counts
+            self._rebuild_counts(math.comb(old_n, 4))
+        self.total += self._recount_total(old_n)
+
+    def recolor(self, edge, color):
+        """
+        Change the color of an already colored edge and return the resulting score.
+        """
+        if self._trial is not None:
+            raise RuntimeError("a trial is pending, commit or roll it back first")
+        old = self.colorings[edge]
+        if old != color:
+            self._apply(edge, old, -1)
+            self._set_color(edge, -1)
+            self._apply(edge, color, 1)
+            self.colorings[edge] = color
+            self._set_color(edge, color)
+        return self.score
+
+    def _rebuild_counts(self, first_rank=0):
+        # Precomputed mode: per-K4 counts of the ranks from first_rank on, from edge_colors
+        for start in range(first_rank, self.index.num_k4s, K4_CHUNK):
+            ranks = np.arange(start, min(start + K4_CHUNK, self.index.num_k4s))
+            colors = self.edge_colors[self.index.k4_edge_ids(ranks)]
+            self.k4_counts[ranks, 0] = (colors == 0).sum(axis=1)
+            self.k4_counts[ranks, 1] = (colors == 1).sum(axis=1)
+
+    def _recount_total(self, from_n=0):
+        # Sum of the weights of the K4s not inside K_{from_n}
+        if not self.lazy:
+            counts = self.k4_counts[math.comb(from_n, 4):]
+            return int(K4_WEIGHTS[counts[:, 0], counts[:, 1]].sum())
+        # Lazy mode: walk the K4s {a, b, c, d}, a < b < c < d, by their two
+        # largest nodes. In colex order the pairs a < b < c are the first
+        # C(c, 2) edge ids, so every (c, d) step reads O(n**2) entries.
+        total = 0
+        pairs = colex_combinations(max(self.n - 1, 0), 2)
+        for d in range(max(3, from_n), self.n):
+            for c in range(2, d):
+                num_pairs = math.comb(c, 2)
+                a, b = pairs[:num_pairs, 0], pairs[:num_pairs, 1]
+                pair_colors = self.edge_colors[:num_pairs]
+                counts = []
+                for color in (0, 1):
+                    per_node = (self.matrix[:c, c] == color).astype(np.uint8) + (self.matrix[:c, d] == color)
+                    counts.append(per_node[a] + per_node[b] + (pair_colors == color) + (self.matrix[c, d] == color))
+                total += int(K4_WEIGHTS[counts[0], counts[1]].sum())
+        return total
+
+    def mono_k4_count(self):
+        """
+        Number of K4s whose six edges are all colored with the same color.
+        """
+        if self.lazy:
+            return sum(count_k4_mono(self.matrix))
+        return int(np.count_nonzero((self.k4_counts == 6).any(axis=1)))
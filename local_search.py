@@ -0,0 +1,137 @@
+import math
+import random
+import time
+
+import numpy as np
+
+from k4_count import count_k4_mono
+from k4_index import colex_combinations
+from k4_scorer import k4_counts_from_matrix, k4_edge_ids_from_pairs
+
+# FLIP_CONTRIBUTION[ones, color] is what one K4 with `ones` edges of color 1
+# adds to the flip gain of one of its edges currently colored `color`:
+# -1 if the K4 is monochromatic (flipping breaks it), +1 if the other five
+# edges all have the other color (flipping completes it), 0 otherwise.
+FLIP_CONTRIBUTION = np.zeros((7, 2), dtype=np.int64)
+FLIP_CONTRIBUTION[0, 0] = FLIP_CONTRIBUTION[6, 1] = -1
+FLIP_CONTRIBUTION[5, 0] = FLIP_CONTRIBUTION[1, 1] = 1
+
+
+class FlipState:
+    """
+    A full 2-coloring of K_n with the change of the monochromatic K4 count
+    for flipping each edge (flip_gains) kept up to date.
+
+    Flipping edge (u, v) only touches the C(n-2, 2) K4s through it, so each
+    flip updates the gains of the edges in those K4s in O(n**2).
+    """
+
+    def __init__(self, matrix):
+        self.n = len(matrix)
+        self.matrix = np.array(matrix, dtype=np.int8)
+        self.edges = colex_combinations(self.n, 2)
+        self.edge_colors = self.matrix[self.edges[:, 0], self.edges[:, 1]].copy()
+        if (self.edge_colors < 0).any():
+            raise ValueError("local search needs a fully colored graph")
+        self._pairs = np.triu_indices(max(self.n - 2, 0), 1)
+        self.mono_k4 = sum(count_k4_mono(self.matrix))
+
+        self.flip_gains = np.empty(len(self.edges), dtype=np.int64)
+        for e, (u, v) in enumerate(self.edges):
+            color = self.edge_colors[e]
+            counts = k4_counts_from_matrix(self.matrix, (u, v), self._pairs)
+            self.flip_gains[e] = np.count_nonzero(counts[:, 1 - color] == 5) - np.count_nonzero(counts[:, color] == 6)
+
+    def flip(self, e):
+        """
+        Flip edge id e and return the change of the monochromatic K4 count.
+        """
+        u, v = self.edges[e]
+        gain = int(self.flip_gains[e])
+        k4_edges = k4_edge_ids_from_pairs(self.n, (u, v), self._pairs)
+        colors = self.edge_colors[k4_edges].astype(np.intp)
+        before = FLIP_CONTRIBUTION[colors.sum(axis=1)[:, None], colors]
+        colors[:, 0] = 1 - colors[:, 0]
+        after = FLIP_CONTRIBUTION[colors.sum(axis=1)[:, None], colors]
+        self.flip_gains += np.bincount(k4_edges.ravel(), weights=(after - before).ravel(),
+                                       minlength=len(self.edges)).astype(np.int64)
+
+        color = 1 - self.edge_colors[e]
+        self.edge_colors[e] = color
+        self.matrix[u, v] = self.matrix[v, u] = color
+        self.mono_k4 += gain
+        return gain
+
+
+def local_search(matrix, time_budget=None, max_flips=None, tabu_tenure=0,
+                 temperature=None, cooling=0.999, seed=None):
+    """
+    Reduce the monochromatic K4 count of a full coloring by flipping edges.
+
+    By default this is steepest-descent hill climbing: flip the edge whose
+    flip lowers the count most, until no flip helps. With tabu_tenure > 0
+    the best non-tabu flip is taken even when it does not improve, and a
+    flipped edge stays frozen for tabu_tenure flips unless flipping it
+    reaches a new best. With a temperature, random edges are flipped with
+    the Metropolis rule and the temperature is multiplied by cooling after
+    every step. Tabu and annealing runs stop on time_budget or max_flips.
+    :param matrix: n x n int8 coloring matrix
+    :param time_budget: seconds to spend, None for no limit
+    :param max_flips: maximal number of flips (or annealing steps), None for no limit
+    :param tabu_tenure: flips during which a flipped edge may not be flipped back
+    :param temperature: initial annealing temperature, None for no annealing
+    :param cooling: annealing temperature factor per step
+    :param seed: random seed for annealing
+    :return: (best coloring matrix, its monochromatic K4 count, number of flips)
+    """
+    if (tabu_tenure or temperature is not None) and time_budget is None and max_flips is None:
+        raise ValueError("tabu and annealing runs need a time_budget or max_flips")
+    state = FlipState(matrix)
+    rng = random.Random(seed)
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    best_matrix, best_mono = state.matrix.copy(), state.mono_k4
+    tabu_until = np.zeros(len(state.edges), dtype=np.int64)
+    step = flips = 0
+
+    while max_flips is None or step < max_flips:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        step += 1
+        if temperature is not None:
+            e = rng.randrange(len(state.edges))
+            gain = state.flip_gains[e]
+            if gain > 0 and rng.random() >= math.exp(-gain / max(temperature, 1e-12)):
+                temperature *= cooling
+                continue
+            temperature *= cooling
+        elif tabu_tenure:
+            allowed = (tabu_until < step) | (state.mono_k4 + state.flip_gains < best_mono)
+            if not allowed.any():
+                break
+            e = int(np.argmin(np.where(allowed, state.flip_gains, np.iinfo(np.int64).max)))
+            tabu_until[e] = step + tabu_tenure
+        else:
+            e = int(np.argmin(state.flip_gains))
+            if state.flip_gains[e] >= 0:
+                break  # local optimum
+        state.flip(e)
+        flips += 1
+        if state.mono_k4 < best_mono:
+            best_matrix, best_mono = state.matrix.copy(), state.mono_k4
+
+    return best_matrix, best_mono, flips
+
+
+if __name__ == "__main__":
+    from numpy_colorer import derandomized_coloring_numpy
+
+    nodes_num = 60
+    coloring = derandomized_coloring_numpy(nodes_num, first_color=0)
+    print(f"greedy: {sum(count_k4_mono(coloring))} monochromatic K4 complete graphs")
+
+    start_time = time.time()
+    coloring, num_k4, flips = local_search(coloring, time_budget=10, tabu_tenure=20)
+    end_time = time.time()
+    print(f"local search: {num_k4} monochromatic K4 complete graphs after {flips} flips, "
+          f"maximum {math.comb(nodes_num, 4) / 32}")
+    print(f"Elapsed time: {end_time - start_time} seconds")
@@ -1,39 +1,49 @@
-import networkx as nx
+from itertools import combinations
 import random
 from time import time
 
-def count_k4_mono(complete_graph):
+from complete_graph import ColoringStore, complete_edges
+
+def k4_edge_colors(coloring, nodes):
+    """
+    Colors of the colored edges among four nodes.
+    :param coloring: ColoringStore
+    :param nodes: four node ids
+    :return: list of int
+    """
+    colors = [coloring.matrix[u, v] for u, v in combinations(nodes, 2)]
+    return [int(c) for c in colors if c >= 0]
+
+def count_k4_mono(coloring):
     """
     Count the number of monochromatic K4 subgraphs in a complete graph.
-    :param complete_graph: NetworkX Graph
+    :param coloring: ColoringStore
     :return: int
     """
     counter = 0
-    num = len(complete_graph.nodes)
+    num = coloring.n
     # Ensure i < j < k < s
     for i in range(num):
         for j in range(i + 1, num):
             for k in range(j + 1, num):
                 for s in range(k + 1, num):
-                    # Get the subgraph for these four nodes
-                    sub_graph_k4 = complete_graph.subgraph([i, j, k, s])
-                    # Get the edges of the subgraph
-                    sub_graph_k4_edges = nx.get_edge_attributes(sub_graph_k4, 'color')
+                    # Get the edge colors of these four nodes
+                    sub_graph_k4_edges = k4_edge_colors(coloring, (i, j, k, s))
                     # Check if all edges are either all 0's or all 1's
-                    if sum(sub_graph_k4_edges.values()) == 6 or sum(sub_graph_k4_edges.values()) == 0:
+                    if sum(sub_graph_k4_edges) == 6 or sum(sub_graph_k4_edges) == 0:
                         counter += 1
     return counter
 
-def calculate_probability_edge_color(complete_graph, edge, color=1):
+def calculate_probability_edge_color(coloring, edge, color=1):
     """
     Calculate the probability of choosing the same color for an edge in the complete graph.
-    :param complete_graph: NetworkX Graph
+    :param coloring: ColoringStore
     :param edge: tuple (node1, node2)
     :param color: int (0 or 1)
     :return: float
     """
     prob = 0
-    num = len(complete_graph.nodes)
+    num = coloring.n
    
     for i in range(num):
         # print((num - i) *  num)
@@ -42,45 +52,56 @@ def calculate_probability_edge_color(complete_graph, edge, color=1):
         for j in range(i + 1, num):
             if j == edge[0] or j == edge[1]:
                 continue
-            # Get the subgraph for these four nodes
-            sub_graph_k4 = complete_graph.subgraph([i, j, edge[0], edge[1]])
-            # Get the edges of the subgraph
-            sub_graph_k4_edges = nx.get_edge_attributes(sub_graph_k4, 'color')
+            # Get the edge colors of these four nodes
+            sub_graph_k4_edges = k4_edge_colors(coloring, (i, j, edge[0], edge[1]))
             # Check the total edge colors
             if len(sub_graph_k4_edges) == 0:
                 prob += 1 / 64
             elif color == 1:
-                if len(sub_graph_k4_edges) == sum(sub_graph_k4_edges.values()):
+                if len(sub_graph_k4_edges) == sum(sub_graph_k4_edges):
                     prob += 1.0 / pow(2, (6 - len(sub_graph_k4_edges)))
             elif color == 0:
-                if sum(sub_graph_k4_edges.values()) == 0:
+                if sum(sub_graph_k4_edges) == 0:
                     prob += 1.0 / pow(2, (6 - len(sub_graph_k4_edges)))
     return prob
 
-start_time = time()
-nodes_num = 30
-graph = nx.complete_graph(nodes_num)
-leave_edges = list(graph.edges)
+def derandomized_coloring(nodes_num):
+    """
+    Color the complete graph edge by edge, always choosing the color that
+    keeps the expected number of monochromatic K4s lower.
+    :param nodes_num: int
+    :return: ColoringStore with every edge colored (to_networkx() exports it)
+    """
+    coloring = ColoringStore(nodes_num)
+    leave_edges = list(complete_edges(nodes_num))
+
+    # Initialize by coloring one edge randomly
+    r_index = 0
+    r_color = 0 if random.random() > 0.5 else 1
+    coloring[leave_edges[r_index]] = r_color
+    leave_edges.remove(leave_edges[r_index])
+
+    while leave_edges:
+        # start_time = time()
+        prob_0 = calculate_probability_edge_color(coloring, leave_edges[0], 0)
+        prob_1 = calculate_probability_edge_color(coloring, leave_edges[0], 1)
+        # end_time = time()
+        # print(end_time - start_time)
+        # Color the edge with the less probable color
+        chosen_color = 1 if prob_0 > prob_1 else 0
+        coloring[leave_edges[0]] = chosen_color
+        leave_edges.pop(0)
 
-# Initialize by coloring one edge randomly
-r_index = 0
-r_color = 0 if random.random() > 0.5 else 1
-graph.add_edge(leave_edges[r_index][0], leave_edges[r_index][1], color=r_color)
-leave_edges.remove(leave_edges[r_index])
+    return coloring
 
-while leave_edges:
-    # start_time = time()
-    prob_0 = calculate_probability_edge_color(graph, leave_edges[0], 0)
-    prob_1 = calculate_probability_edge_color(graph, leave_edges[0], 1)
-    # end_time = time()
-    # print(end_time - start_time)
-    # Color the edge with the less probable color
-    chosen_color = 1 if prob_0 > prob_1 else 0
-    graph.add_edge(leave_edges[0][0], leave_edges[0][1], color=chosen_color)
-    leave_edges.pop(0)
+if __name__ == "__main__":
+    start_time = time()
+    nodes_num = 30
+    coloring = derandomized_coloring(nodes_num)
+    leave_edges = [edge for edge in complete_edges(nodes_num) if edge not in coloring]
 
-print(f"Remaining uncolored edges: {len(leave_edges)}")
-num_k4 = count_k4_mono(graph)
-print(f"{nodes_num} nodes, maximum {nodes_num * (nodes_num - 1) * (nodes_num - 2) * (nodes_num - 3) / (4 * 3 * 2 * 1 * 32)} monochromatic K4 complete graphs, generated graph has {num_k4} monochromatic K4 complete graphs")
-end_time = time()
-print(f"Elapsed time: {end_time - start_time} seconds")
+    print(f"Remaining uncolored edges: {len(leave_edges)}")
+    num_k4 = count_k4_mono(coloring)
+    print(f"{nodes_num} nodes, maximum {nodes_num * (nodes_num - 1) * (nodes_num - 2) * (nodes_num - 3) / (4 * 3 * 2 * 1 * 32)} monochromatic K4 complete graphs, generated graph has {num_k4} monochromatic K4 complete graphs")
+    end_time = time()
+    print(f"Elapsed time: {end_time - start_time} seconds")
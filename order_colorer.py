@@ -0,0 +1,149 @@
+import argparse
+from itertools import combinations
+import math
+import sys
+import time
+
+import numpy as np
+
+from heap_greedy import heap_greedy_coloring
+from k4_index import colex_combinations
+from k4_scorer import K4DeltaScorer, K4_GAINS
+
+
+def lexicographic_order(n, rng=None):
+    """
+    (0, 1), (0, 2), ..., (0, n-1), (1, 2), ...: all edges of one node first.
+    """
+    return list(combinations(range(n), 2))
+
+
+def vertex_order(n, rng=None):
+    """
+    Edge id (colex) order: node v joins with (0, v), ..., (v-1, v), so every
+    prefix colors a complete K_v.
+    """
+    return [tuple(edge) for edge in colex_combinations(n, 2).tolist()]
+
+
+def random_order(n, rng):
+    edges = vertex_order(n)
+    return [edges[e] for e in rng.permutation(len(edges))]
+
+
+def balanced_order(n, rng=None):
+    """
+    Rounds of perfect matchings (the circle method), so the number of
+    colored edges at every node grows evenly.
+    """
+    size = n + n % 2  # an odd n gets a dummy node
+    circle = list(range(size))
+    order = []
+    for _ in range(size - 1):
+        for k in range(size // 2):
+            u, v = circle[k], circle[size - 1 - k]
+            if u < n and v < n:
+                order.append((min(u, v), max(u, v)))
+        circle = [circle[0], circle[-1]] + circle[1:-1]
+    return order
+
+
+# name -> function(n, rng) returning every edge (u, v), u < v, once
+ORDERINGS = {
+    "lexicographic": lexicographic_order,
+    "vertex": vertex_order,
+    "random": random_order,
+    "balanced": balanced_order,
+}
+
+
+def fixed_order_coloring(n, ordering="vertex", seed=None, random_ties=False, lazy=None, instrumentation=None,
+                         index=None):
+    """
+    One pass over the edges in a fixed order, each edge getting the color
+    that raises the expected number of monochromatic K4s the least.
+
+    This is the method of conditional expectations (makehui.py's approach)
+    on K4DeltaScorer: E color decisions of O(n**2) each, instead of a search
+    for the best edge at every step.
+    :param n: number of nodes of the complete graph
+    :param ordering: name from ORDERINGS
+    :param seed: seed of the random ordering and random ties
+    :param random_ties: pick the color at random on equal deltas instead of color 0
+    :param lazy: K4DeltaScorer mode, None to choose by n
+    :param instrumentation: optional Instrumentation for counters, timers and progress
+    :param index: optional K4Index of some K_m, m >= n, to reuse (see K4Index.prefix)
+    :return: (colorings, number of monochromatic K4s)
+    """
+    rng = np.random.default_rng(seed)
+    scorer = K4DeltaScorer(n, lazy, instrumentation, index)
+    for edge in ORDERINGS[ordering](n, rng):
+        # Both colors from one read of the K4s through the edge
+        counts = scorer.k4_counts_through(edge)
+        delta_0, delta_1 = K4_GAINS[counts[:, 0], counts[:, 1]].sum(axis=0)
+        if delta_0 == delta_1:
+            color = int(rng.integers(2)) if random_ties else 0
+        else:
+            color = 0 if delta_0 < delta_1 else 1
+        scorer.color_edge(edge, color)
+        if instrumentation is not None:
+            instrumentation.progress(len(scorer.colorings), scorer.num_edges, score=scorer.score)
+    return scorer.colorings, scorer.mono_k4_count()
+
+
+def compare_orderings(sizes, orderings=tuple(ORDERINGS), seed=0, greedy_max_n=60, report=print):
+    """
+    Quality and time of every ordering against the best-edge greedy search
+    (heap_greedy, run up to greedy_max_n).
+    :return: list of rows (n, name, mono, seconds, mono / greedy mono or None)
+    """
+    rows = []
+    for n in sizes:
+        greedy = None
+        if n <= greedy_max_n:
+            start = time.perf_counter()
+            _, greedy = heap_greedy_coloring(n)
+            rows.append((n, "greedy", greedy, time.perf_counter() - start, 1.0 if greedy else None))
+        for ordering in orderings:
+            start = time.perf_counter()
+            _, mono = fixed_order_coloring(n, ordering, seed)
+            rows.append((n, ordering, mono, time.perf_counter() - start, mono / greedy if greedy else None))
+        if report is not None:
+            bound = math.comb(n, 4) / 32
+            for row in rows[-len(orderings) - (greedy is not None):]:
+                ratio = "" if row[4] is None else f" {row[4]:.3f}x greedy"
+                report(f"n={n:<4d} {row[1]:14s} mono={row[2]:<8d} {row[2] / bound:.3f}x bound "
+                       f"{row[3]:8.3f}s{ratio}")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fixed-order colorer: one color decision per edge, no best-edge search.")
+    parser.add_argument("n", type=int, nargs="?", help="number of nodes")
+    parser.add_argument("--ordering", default="vertex", choices=sorted(ORDERINGS))
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random ordering")
+    parser.add_argument("--compare", metavar="SIZES",
+                        help="instead of coloring, compare all orderings with the greedy search on these comma separated n")
+    parser.add_argument("--output", help="write the coloring to this coloring_io file")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare_orderings([int(x) for x in args.compare.split(",") if x], seed=args.seed)
+        return 0
+    if args.n is None:
+        parser.error("n is required unless --compare is given")
+
+    start_time = time.time()
+    colorings, mono = fixed_order_coloring(args.n, args.ordering, args.seed)
+    print(f"{args.ordering} order, {args.n} nodes: {mono} monochromatic K4s, bound {math.comb(args.n, 4) / 32}, "
+          f"{time.time() - start_time:.3f} seconds")
+    if args.output:
+        from coloring_io import save_coloring
+        from k4_count import colorings_to_matrix
+        save_coloring(args.output, colorings_to_matrix(args.n, colorings), f"fixed_order/{args.ordering}",
+                      args.seed, mono)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
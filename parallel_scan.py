@@ -0,0 +1,105 @@
+from concurrent.futures import ProcessPoolExecutor
+import math
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+
+from k4_count import count_k4_mono
+from k4_index import colex_combinations
+from k4_scorer import K4_GAINS, k4_counts_from_matrix
+
+_worker = {}  # per-process view of the shared coloring, set up by _init_worker
+
+
+def best_candidate(matrix, edges, pairs, edge_ids):
+    """
+    Smallest (delta, edge id, color) among the given uncolored edges.
+
+    Candidates are compared as whole tuples, so ties on delta go to the
+    lowest edge id and then to color 0, whatever the chunking.
+    :param matrix: n x n int8 color matrix, -1 for uncolored edges
+    :param edges: (num_edges, 2) endpoints in edge id order
+    :param pairs: np.triu_indices(n - 2, 1)
+    :param edge_ids: ids of the candidate edges
+    :return: (delta in units of 2**-6, edge id, color) or None
+    """
+    best = None
+    for e in edge_ids:
+        u, v = edges[e]
+        counts = k4_counts_from_matrix(matrix, (u, v), pairs)
+        gains = K4_GAINS[counts[:, 0], counts[:, 1]].sum(axis=0)
+        for color in (0, 1):
+            candidate = (int(gains[color]), int(e), color)
+            if best is None or candidate < best:
+                best = candidate
+    return best
+
+
+def _init_worker(shared, n):
+    matrix = np.frombuffer(shared, dtype=np.int8).reshape(n, n)
+    _worker.update(matrix=matrix, edges=colex_combinations(n, 2), pairs=np.triu_indices(max(n - 2, 0), 1))
+
+
+def _scan_chunk(edge_ids):
+    return best_candidate(_worker["matrix"], _worker["edges"], _worker["pairs"], edge_ids)
+
+
+def parallel_greedy_coloring(n, workers=None, chunks_per_worker=4):
+    """
+    Best-edge greedy coloring with the candidate scan split over a process pool.
+
+    The coloring lives in a shared-memory int8 matrix that the workers map
+    once at start-up, so each step only ships arrays of candidate edge ids.
+    Every worker returns its best (delta, edge id, color) and the smallest
+    one is committed, which reproduces the serial scan exactly.
+    :param n: number of nodes of the complete graph
+    :param workers: pool size, os.cpu_count() by default; 1 scans in-process
+    :param chunks_per_worker: candidate chunks per worker and step
+    :return: (colorings, number of monochromatic K4s)
+    """
+    workers = workers or os.cpu_count()
+    shared = mp.RawArray("b", n * n)
+    matrix = np.frombuffer(shared, dtype=np.int8).reshape(n, n)
+    matrix[:] = -1
+    edges = colex_combinations(n, 2)
+    pairs = np.triu_indices(max(n - 2, 0), 1)
+    remaining = np.arange(len(edges))
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(shared, n))
+    try:
+        while len(remaining):
+            if pool is None:
+                best = best_candidate(matrix, edges, pairs, remaining)
+            else:
+                chunks = np.array_split(remaining, min(len(remaining), workers * chunks_per_worker))
+                results = [future.result() for future in [pool.submit(_scan_chunk, chunk) for chunk in chunks]]
+                best = min(result for result in results if result is not None)
+            _, e, color = best
+            u, v = edges[e]
+            matrix[u, v] = matrix[v, u] = color
+            remaining = remaining[remaining != e]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    colorings = {(int(u), int(v)): int(matrix[u, v]) for u, v in edges}
+    return colorings, sum(count_k4_mono(matrix))
+
+
+if __name__ == "__main__":
+    n = 40
+
+    start_time = time.time()
+    colorings, same_colored_K4 = parallel_greedy_coloring(n)
+    end_time = time.time()
+    print(end_time - start_time)
+    # Theoretical minimum same-colored K4 graphs
+    theoretical_min_K4 = math.comb(n, 4) // 32
+
+    print(same_colored_K4)
+    print(theoretical_min_K4)
+    print("########################")
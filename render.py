@@ -0,0 +1,69 @@
+import numpy as np
+
+# Up to this many nodes the colored K_n is drawn with a spring layout;
+# above it the O(n**2) adjacency heatmap is drawn instead.
+LAYOUT_MAX_N = 30
+
+
+def _draw_layout(ax, matrix):
+    import networkx as nx
+
+    n = len(matrix)
+    graph = nx.complete_graph(n)
+    pos = nx.spring_layout(graph)  # Generate positions for the nodes
+
+    # Extracting edges of each color
+    edges_color_0 = [(u, v) for u, v in graph.edges() if matrix[u, v] == 0]
+    edges_color_1 = [(u, v) for u, v in graph.edges() if matrix[u, v] == 1]
+
+    nx.draw_networkx_nodes(graph, pos, ax=ax, node_size=700, node_color='lightgrey', edgecolors='black')
+    nx.draw_networkx_labels(graph, pos, ax=ax)
+    nx.draw_networkx_edges(graph, pos, ax=ax, edgelist=edges_color_0, edge_color='blue', width=2)
+    nx.draw_networkx_edges(graph, pos, ax=ax, edgelist=edges_color_1, edge_color='red', width=2)
+    ax.axis('off')
+
+
+def _draw_heatmap(ax, matrix):
+    from matplotlib.colors import ListedColormap
+
+    # -1 (diagonal / uncolored) white, color 0 blue, color 1 red
+    ax.imshow(np.asarray(matrix), cmap=ListedColormap(['white', 'blue', 'red']), vmin=-1, vmax=1,
+              interpolation='nearest')
+    ax.set_xlabel('node')
+    ax.set_ylabel('node')
+
+
+def render_coloring(matrix, path=None, title=None, layout=None):
+    """
+    Draw a 2-coloring of K_n.
+
+    matplotlib (and networkx for the layout) is only imported here, so the
+    colorers themselves never pay for it. With a path the figure is written
+    to that file without any GUI backend; otherwise it is shown.
+    :param matrix: n x n coloring matrix, -1 for uncolored edges
+    :param path: image file to write, None to show the figure
+    :param title: figure title
+    :param layout: True for the spring layout, False for the heatmap,
+                   None to pick by n (see LAYOUT_MAX_N)
+    """
+    if layout is None:
+        layout = len(matrix) <= LAYOUT_MAX_N
+    if path is None:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(8, 6))
+    else:
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=(8, 6))
+    ax = fig.add_subplot()
+
+    if layout:
+        _draw_layout(ax, matrix)
+    else:
+        _draw_heatmap(ax, matrix)
+    if title is not None:
+        ax.set_title(title)
+
+    if path is None:
+        plt.show()
+    else:
+        fig.savefig(path)
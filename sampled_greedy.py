@@ -0,0 +1,197 @@
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+from heap_greedy import heap_greedy_coloring
+from k4_count import count_k4_mono
+from k4_index import colex_combinations
+from k4_scorer import K4_GAINS, k4_counts_from_matrix
+
+
+# Each edge color packed so that five of them sum to count_0 + 8 * count_1,
+# indexed by color + 1 (uncolored, 0, 1); GAINS_BY_CODE maps such a sum to
+# the K4 gains of both colors.
+CODE_OF_COLOR = np.array([0, 1, 8], dtype=np.int8)
+GAINS_BY_CODE = np.zeros((41, 2), dtype=np.int64)
+for _count_0 in range(6):
+    for _count_1 in range(6 - _count_0):
+        GAINS_BY_CODE[_count_0 + 8 * _count_1] = K4_GAINS[_count_0, _count_1]
+
+
+def color_codes(matrix):
+    """
+    CODE_OF_COLOR of every entry of a color matrix.
+    """
+    return CODE_OF_COLOR[np.asarray(matrix) + 1]
+
+
+def _skip(x, low, high):
+    """
+    Map x in range(n - 2) onto range(n) minus the nodes low < high.
+    """
+    x = x + (x >= low)
+    return x + (x >= high)
+
+
+def estimate_deltas(codes, u, v, k4_samples, rng):
+    """
+    Estimated delta (units of 2**-6) of coloring each candidate edge (u, v)
+    with either color, from k4_samples K4s drawn uniformly with replacement
+    among the C(n-2, 2) K4s through the edge.
+    :param codes: color_codes of the n x n color matrix
+    :param u, v: int arrays of candidate endpoints, u < v
+    :return: (len(u), 2) float array
+    """
+    n = len(codes)
+    m = len(u)
+    u = u[:, None]
+    v = v[:, None]
+    # Two distinct positions among the n - 2 other nodes, then mapped past u and v
+    i = rng.integers(n - 2, size=(m, k4_samples))
+    j = rng.integers(n - 3, size=(m, k4_samples))
+    j += j >= i
+    i = _skip(i, u, v)
+    j = _skip(j, u, v)
+    code = codes[u, i] + codes[u, j] + codes[v, i] + codes[v, j] + codes[i, j]
+    return GAINS_BY_CODE[code].mean(axis=1) * math.comb(n - 2, 2)
+
+
+def exact_deltas(matrix, u, v):
+    """
+    Exact delta of coloring each candidate edge (u, v) with either color,
+    summed over all C(n-2, 2) K4s through it.
+    :return: (len(u), 2) int64 array
+    """
+    deltas = np.zeros((len(u), 2), dtype=np.int64)
+    pairs = np.triu_indices(max(len(matrix) - 2, 0), 1)
+    for row, edge in enumerate(zip(u.tolist(), v.tolist())):
+        counts = k4_counts_from_matrix(matrix, edge, pairs)
+        deltas[row] = K4_GAINS[counts[:, 0], counts[:, 1]].sum(axis=0)
+    return deltas
+
+
+def candidate_deltas(matrix, codes, u, v, k4_samples, rng):
+    """
+    Deltas of candidate edges (u[i], v[i]) for both colors: exact when
+    k4_samples is None or covers every K4 through an edge, sampled otherwise.
+    :return: (len(u), 2) array
+    """
+    n = len(matrix)
+    if k4_samples is None or k4_samples >= math.comb(n - 2, 2):
+        return exact_deltas(matrix, u, v)
+    return estimate_deltas(codes, u, v, k4_samples, rng)
+
+
+def sampled_greedy_coloring(n, edge_samples=64, k4_samples=256, seed=None, instrumentation=None, count=True):
+    """
+    Approximate best-edge greedy for large n.
+
+    Each step scores only edge_samples uncolored edges drawn at random, and
+    estimates each of their deltas from k4_samples random K4s instead of
+    all C(n-2, 2), so a step costs O(edge_samples * k4_samples) whatever n
+    is. The sampled edge and color with the smallest estimate is colored.
+    None for either sample size means exact: every uncolored edge, or every
+    K4 through it.
+    :param n: number of nodes of the complete graph
+    :param edge_samples: candidate edges scored per step, None for all
+    :param k4_samples: K4s sampled per candidate, None for all
+    :param seed: seed of the sampling
+    :param instrumentation: optional Instrumentation for counters, timers and progress
+    :param count: count the monochromatic K4s of the result (O(n**3) per color)
+    :return: (n x n int8 coloring matrix, number of monochromatic K4s or None)
+    """
+    rng = np.random.default_rng(seed)
+    matrix = np.full((n, n), -1, dtype=np.int8)
+    codes = color_codes(matrix)
+    uncolored = colex_combinations(n, 2)
+    remaining = len(uncolored)
+    num_edges = remaining
+
+    while remaining:
+        if instrumentation is not None:
+            step_start = time.perf_counter()
+        # Candidates are drawn from the first `remaining` rows, the uncolored edges
+        if edge_samples is None or edge_samples >= remaining:
+            rows = np.arange(remaining)
+        else:
+            rows = rng.choice(remaining, size=edge_samples, replace=False)
+        u, v = uncolored[rows, 0], uncolored[rows, 1]
+        deltas = candidate_deltas(matrix, codes, u, v, k4_samples, rng)
+        best = int(np.argmin(deltas))
+        row, color = rows[best // 2], best % 2
+        a, b = uncolored[row]
+        matrix[a, b] = matrix[b, a] = color
+        codes[a, b] = codes[b, a] = CODE_OF_COLOR[color + 1]
+
+        # Swap the colored edge behind the uncolored ones
+        remaining -= 1
+        uncolored[[row, remaining]] = uncolored[[remaining, row]]
+        if instrumentation is not None:
+            instrumentation.count("candidates", len(rows))
+            instrumentation.add_time("step", time.perf_counter() - step_start)
+            instrumentation.progress(num_edges - remaining, num_edges)
+
+    return matrix, sum(count_k4_mono(matrix)) if count else None
+
+
+def quality_gap(sizes, edge_samples=64, k4_samples=256, seeds=(0,), report=print):
+    """
+    Compare the sampled greedy with the exact best-edge greedy (heap_greedy)
+    on sizes where the latter is still affordable.
+    :return: list of rows (n, seed, exact mono, sampled mono, gap, exact seconds, sampled seconds),
+             gap being sampled / exact - 1 (None when exact is 0)
+    """
+    rows = []
+    for n in sizes:
+        start = time.perf_counter()
+        _, exact = heap_greedy_coloring(n)
+        exact_seconds = time.perf_counter() - start
+        for seed in seeds:
+            start = time.perf_counter()
+            _, sampled = sampled_greedy_coloring(n, edge_samples, k4_samples, seed)
+            sampled_seconds = time.perf_counter() - start
+            gap = sampled / exact - 1 if exact else None
+            rows.append((n, seed, exact, sampled, gap, exact_seconds, sampled_seconds))
+            if report is not None:
+                gap_text = "n/a" if gap is None else f"{gap:+.1%}"
+                report(f"n={n:<4d} seed={seed:<3d} exact={exact} ({exact_seconds:.2f}s) "
+                       f"sampled={sampled} ({sampled_seconds:.2f}s) gap={gap_text}")
+    return rows
+
+
+def _optional_int(text):
+    return None if text.lower() in ("all", "none") else int(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sampled best-edge greedy coloring of K_n for large n.")
+    parser.add_argument("n", type=int, nargs="?", help="number of nodes")
+    parser.add_argument("--edge-samples", type=_optional_int, default=64, help='candidates per step, "all" for exact')
+    parser.add_argument("--k4-samples", type=_optional_int, default=256, help='K4s per candidate, "all" for exact')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--gap", metavar="SIZES",
+                        help="instead of coloring, report the quality gap against exact greedy on these comma separated n")
+    parser.add_argument("--output", help="write the coloring to this coloring_io file")
+    args = parser.parse_args(argv)
+
+    if args.gap:
+        quality_gap([int(x) for x in args.gap.split(",") if x], args.edge_samples, args.k4_samples, (args.seed,))
+        return 0
+    if args.n is None:
+        parser.error("n is required unless --gap is given")
+
+    start_time = time.time()
+    matrix, mono = sampled_greedy_coloring(args.n, args.edge_samples, args.k4_samples, args.seed)
+    print(f"{args.n} nodes: {mono} monochromatic K4s, bound {math.comb(args.n, 4) / 32}, "
+          f"{time.time() - start_time:.3f} seconds")
+    if args.output:
+        from coloring_io import save_coloring
+        save_coloring(args.output, matrix, "sampled_greedy", args.seed, mono)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
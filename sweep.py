@@ -0,0 +1,158 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+import io
+import json
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from coloring_io import save_coloring
+from colorers import COLORERS, INDEXED_COLORERS, run_colorer
+from k4_count import count_k4_mono
+from k4_index import K4Index
+from k4_scorer import LAZY_MIN_N
+
+# Largest K4Index built in this process. Every smaller n is served from its
+# prefix, so a worker running sizes largest first builds the index once.
+_index = None
+
+
+def shared_index(n):
+    """
+    A K4Index covering K_n, built only when no index of this process covers it yet.
+    :return: (index or None when the scorer runs lazily at this n, True if it had to be built)
+    """
+    global _index
+    if n >= LAZY_MIN_N:
+        return None, False
+    if _index is not None and _index.n >= n:
+        return _index, False
+    _index = K4Index(n)
+    return _index, True
+
+
+def run_size(name, n, seed=None):
+    """
+    Color K_n once with the named colorer.
+    :return: (result row, n x n coloring matrix)
+    """
+    index, built = shared_index(n) if name in INDEXED_COLORERS else (None, False)
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    with redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        matrix = run_colorer(name, n, index)
+        seconds = time.perf_counter() - start
+    mono_k4 = sum(count_k4_mono(matrix))
+    bound = math.comb(n, 4) / 32
+    row = {
+        "algorithm": name,
+        "n": n,
+        "seed": seed,
+        "seconds": seconds,
+        "mono_k4": mono_k4,
+        "bound": bound,
+        "ratio": mono_k4 / bound if bound else None,
+        "index": None if index is None else ("built" if built else "reused"),
+    }
+    return row, matrix
+
+
+def finished_sizes(path, name, seed=None):
+    """
+    The n already recorded for this colorer and seed in a sweep output file.
+    """
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if row["algorithm"] == name and row["seed"] == seed:
+                done.add(row["n"])
+    return done
+
+
+def sweep(name, sizes, output, workers=None, seed=None, colorings_path=None, report=print):
+    """
+    Color K_n for every n in sizes, spread over a process pool.
+
+    Sizes are handed out largest first, which balances the pool and lets
+    each worker serve smaller n from the prefix of the K4Index it already
+    built. Every result is appended to `output` as one JSON line as soon as
+    it arrives, so an interrupted sweep loses only the sizes in flight;
+    sizes already in `output` are skipped on the next run.
+    :param name: colorer name, see colorers.COLORERS
+    :param sizes: iterable of n
+    :param output: JSON lines result file, appended to
+    :param workers: number of processes, 1 to run in this process, None for all CPUs
+    :param seed: random seed for colorers with random choices
+    :param colorings_path: also append every coloring to this coloring_io file
+    :return: number of sizes run
+    """
+    done = finished_sizes(output, name, seed)
+    todo = sorted(set(sizes) - done, reverse=True)
+    if report is not None and done:
+        report(f"skipping {len(set(sizes) & done)} sizes already in {output}")
+
+    def record(row, matrix):
+        with open(output, "a") as f:
+            f.write(json.dumps(row) + "\n")
+        if colorings_path is not None:
+            save_coloring(colorings_path, matrix, name, seed, row["mono_k4"], append=True)
+        if report is not None:
+            report(f"{name:14s} n={row['n']:<4d} {row['seconds']:10.3f}s "
+                   f"mono={row['mono_k4']} bound={row['bound']:.1f}")
+
+    if workers == 1:
+        for n in todo:
+            record(*run_size(name, n, seed))
+        return len(todo)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_size, name, n, seed) for n in todo]
+        for future in as_completed(futures):
+            record(*future.result())
+    return len(todo)
+
+
+def _sizes(text):
+    """
+    Parse "10-200", "10-200:10" or "8,12,16" (and comma separated mixes) into a list of n.
+    """
+    sizes = []
+    for part in text.split(","):
+        if not part:
+            continue
+        part, _, step = part.partition(":")
+        first, _, last = part.partition("-")
+        sizes.extend(range(int(first), int(last or first) + 1, int(step or 1)))
+    return sizes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run one colorer over many n in parallel, streaming results to disk.")
+    parser.add_argument("algorithm", choices=sorted(COLORERS))
+    parser.add_argument("sizes", type=_sizes, help='n values, e.g. "10-200", "10-200:10" or "8,12,16"')
+    parser.add_argument("--workers", type=int, help="number of processes (default: all CPUs, 1 runs serially)")
+    parser.add_argument("--seed", type=int, help="seed for colorers with random choices")
+    parser.add_argument("--output", default="sweep.jsonl", help="JSON lines result file, resumed if it exists")
+    parser.add_argument("--save-colorings", help="append every coloring to this coloring_io file")
+    args = parser.parse_args(argv)
+
+    start_time = time.time()
+    count = sweep(args.algorithm, args.sizes, args.output, args.workers, args.seed, args.save_colorings)
+    print(f"{count} sizes in {time.time() - start_time:.1f} seconds, results in {os.path.abspath(args.output)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,11 @@
 from itertools import combinations
-import networkx as nx
-import matplotlib.pyplot as plt
 import numpy as np
 import time
 
+from complete_graph import CompleteGraph
+from k4_count import colorings_to_matrix
+from render import render_coloring
+
 def calculate_score_for_edge(G, edge, current_colorings, potential_color):
     """
     Calculate the change in score if this edge is colored with the potential_color.
@@ -35,7 +37,7 @@ def calculate_score_for_edge(G, edge, current_colorings, potential_color):
     return score
 
 def greedy_coloring_updated(n):
-    G = nx.complete_graph(n)
+    G = CompleteGraph(n)
     colorings = {}  # store the color of edges, initially uncolored
 
     # Iterate over all edges to color them
@@ -68,44 +70,30 @@ def greedy_coloring_updated(n):
 
     return G, colorings, same_colored_K4
 
-# Running the algorithm with n = 5
-n = 20
-
-start_time = time.time()  # 记录开始时间
-G, colorings, same_colored_K4_count = greedy_coloring_updated(n)
-end_time = time.time()  # 记录结束时间
-elapsed_time = end_time - start_time  # 计算经过时间
-print(elapsed_time)
-# Theoretical minimum same-colored K4 graphs
-theoretical_min_K4 = (n*(n-1)*(n-2)*(n-3)) // (4*3*2*1) // 32
-
-G, colorings, same_colored_K4_count, theoretical_min_K4
-
-print(same_colored_K4_count)
-print(theoretical_min_K4)
-print("########################")
+if __name__ == "__main__":
+    # Running the algorithm with n = 5
+    n = 20
 
+    start_time = time.time()  # 记录开始时间
+    G, colorings, same_colored_K4_count = greedy_coloring_updated(n)
+    end_time = time.time()  # 记录结束时间
+    elapsed_time = end_time - start_time  # 计算经过时间
+    print(elapsed_time)
+    # Theoretical minimum same-colored K4 graphs
+    theoretical_min_K4 = (n*(n-1)*(n-2)*(n-3)) // (4*3*2*1) // 32
 
+    G, colorings, same_colored_K4_count, theoretical_min_K4
 
-# Visualizing the graph with updated colored edges
-pos = nx.spring_layout(G)  # Generate positions for the nodes
+    print(same_colored_K4_count)
+    print(theoretical_min_K4)
+    print("########################")
 
-# Extracting edges of each color
-edges_color_0 = [(u, v) for (u, v), color in colorings.items() if color == 0]
-edges_color_1 = [(u, v) for (u, v), color in colorings.items() if color == 1]
 
-# Drawing the graph
-plt.figure(figsize=(8, 6))
-nx.draw_networkx_nodes(G, pos, node_size=700, node_color='lightgrey', edgecolors='black')
-nx.draw_networkx_labels(G, pos)
-nx.draw_networkx_edges(G, pos, edgelist=edges_color_0, edge_color='blue', width=2)
-nx.draw_networkx_edges(G, pos, edgelist=edges_color_1, edge_color='red', width=2)
 
-plt.axis('off')
-plt.title('Updated Colored Complete Graph $K_5$')
-plt.show()
+    # Visualizing the graph with updated colored edges
+    render_coloring(colorings_to_matrix(n, colorings), title='Updated Colored Complete Graph $K_5$')
 
-print(same_colored_K4_count)
-print(theoretical_min_K4)
+    print(same_colored_K4_count)
+    print(theoretical_min_K4)
 
-# G, colorings, same_colored_K4_count, theoretical_min_K4
+    # G, colorings, same_colored_K4_count, theoretical_min_K4